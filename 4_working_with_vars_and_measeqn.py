@@ -1,12 +1,13 @@
 from keysight.ads import de
 from keysight.ads.de import db_uu as db
 from keysight.edatoolbox import ads
-import keysight.ads.dataset as dataset
 import os
 import matplotlib.pyplot as plt
 from IPython.core import getipython
 from pathlib import Path
-import numpy as np
+ 
+from dataset_utils import IndexedDataset, load_varblock
+import rf_kernels
  
  
 workspace_path = "C:/ADS_Python_Tutorials/tutorial4_wrk"
@@ -142,7 +143,7 @@ simulator.run_netlist(netlist, output_dir=target_output_dir)
  
 ##### Data Processing & Plot #####
  
-output_data = dataset.open(
+output_data = IndexedDataset(
     Path(os.path.join(target_output_dir, f"{cell_name}" + ".ds"))
 )
  
@@ -150,23 +151,21 @@ output_data = dataset.open(
 print("Available Data Blocks: ", output_data.varblock_names)
  
 # Finding relevant data block containing our results
-for datablock in output_data.find_varblocks_with_var_name("groupdelay"):
-    print("Group Delay expression is found in:", datablock.name)
-    gd = datablock.name
+gd = output_data.find_varblock("groupdelay")
+print("Group Delay expression is found in:", gd)
  
-for datablock in output_data.find_varblocks_with_var_name("S[2,1]"):
-    print("S21 measurement is found in:", datablock.name)
-    sp = datablock.name
+sp = output_data.find_varblock("S[2,1]")
+print("S21 measurement is found in:", sp)
  
-# Convert SP1.SP datablock to the pandas dataframe
-mydata = output_data[sp].to_dataframe().reset_index()
-# Convert Group Delay datablock to the pandas dataframe
-mygd = output_data[gd].to_dataframe().reset_index()
+# Load S21 & S11 from the data block as NumPy arrays over freq
+mydata = load_varblock(output_data[sp], ["S[2,1]", "S[1,1]"])
+# Load the Group Delay MeasEqn result
+mygd = load_varblock(output_data[gd], ["groupdelay"])
  
 # Extract data and convert S21 & S11 to dB
-freq = mydata["freq"] / 1e6
-S21 = 20 * np.log10(abs(mydata["S[2,1]"]))
-S11 = 20 * np.log10(abs(mydata["S[1,1]"]))
+freq = mydata.axes["freq"] / 1e6
+S21 = rf_kernels.db(mydata.values["S[2,1]"])
+S11 = rf_kernels.db(mydata.values["S[1,1]"])
  
 # Plot results using inline plot from matplotlib
 ipython = getipython.get_ipython()
@@ -180,8 +179,11 @@ plt.plot(freq, S21)
 plt.plot(freq, S11)
  
 # Plot Group Delay results using inline plot from matplotlib
-freq = mygd["freq"] / 1e6
-groupdelay = mygd["groupdelay"] / 1e-9
+# The MeasEqn result is overlaid with the same quantity computed in Python
+# from S21 (rf_kernels.group_delay), which needs no re-simulation
+gd_freq = mygd.axes["freq"] / 1e6
+groupdelay = mygd.values["groupdelay"] / 1e-9
+groupdelay_py = rf_kernels.group_delay(mydata.values["S[2,1]"], mydata.axes["freq"], centered=True) / 1e-9
  
 ipython = getipython.get_ipython()
 ipython.run_line_magic("matplotlib", "inline")
@@ -190,4 +192,6 @@ ax.set_title("Filter Group Delay Response")
 plt.xlabel("Frequency (MHz)")
 plt.ylabel("Group Delay (nsec)")
 plt.grid(True)
-plt.plot(freq, groupdelay)
\ No newline at end of file
+plt.plot(gd_freq, groupdelay, label="MeasEqn")
+plt.plot(freq, groupdelay_py, "--", label="rf_kernels.group_delay")
+plt.legend()
\ No newline at end of file
@@ -9,6 +9,12 @@ from keysight.ads.de import db_uu as db
 from keysight.edatoolbox import ads
 import keysight.ads.dataset as dataset
  
+from lpf_synthesis import lpf_design_by_Atten
+from dataset_utils import load_varblock
+from spec_mask import SpecMask, evaluate_mask
+from schematic_builder import Component, build_schematic, lc_ladder_spec
+from netlist_writer import GOLDEN_DIR, check_against_schematic, lc_ladder_netlist
+ 
  
 ripple_db = 0.1  # Passband ripple
 fc = 800e6  # Passband corner freq in Hz
@@ -21,49 +27,9 @@ cell_name = "python_filter_schematic"
 library_name = "tutorial5_lib"
  
  
-# Chebyshev LPF Designer
-def lpf_design_by_Atten(ripple_db, fc, fs, R0, La):
-    ep = 10 ** (ripple_db / 10) - 1
-    pi = np.pi
-    wc = 2 * pi * fc  # angular passband freq
-    ws = 2 * pi * fs  # angular stopband freq
- 
-    N = round(np.sqrt(np.arccosh((10 ** (La) - 1) / ep)) / np.arccosh(ws / wc)) - 1
- 
-    Atten = 0 - 10 * np.log10(1 + ep * np.cosh((N * np.arccosh(ws / wc))) ** 2)
-    Atten = round(Atten, 2)
- 
-    beta = np.log(1 / np.tanh(ripple_db / 17.37))
-    gamma = np.sinh(beta / (2 * N))
- 
-    L = []
-    C = []
-    ak = []
-    bk = []
-    gk = []
- 
-    for k in range(1, N + 1):
-        a1 = np.sin(((2 * k - 1) * pi) / (2 * N))
-        ak.append(a1)
- 
-        b1 = gamma**2 + (np.sin(k * pi / N)) ** 2
-        bk.append(b1)
- 
-    for k in range(1, N + 1):
-        if k == 1:
-            gk.append(round(2 * ak[k - 1] / gamma, 4))
-        else:
-            gk.append(round((4 * ak[k - 2] * ak[k - 1]) / (bk[k - 2] * gk[k - 2]), 4))
- 
-        if k % 2 != 0:
-            L.append(round(((R0 * gk[k - 1] / wc) / 1e-9), 2))
-        else:
-            C.append(round((gk[k - 1] / (R0 * wc)) / 1e-12, 2))
-    return L, C, N, Atten, gk
- 
- 
 # Design a low pass filter using the required attenuation method
-L, C, N, La, gk = lpf_design_by_Atten(ripple_db, fc, fs, R0, La)
+La_required = La
+L, C, N, La, gk = lpf_design_by_Atten(ripple_db, fc, fs, R0, La_required)
  
 print("\ng-values=", gk)
 print("Filter Design with Required Attenuation Method")
@@ -114,39 +80,16 @@ lib = create_a_library_and_add_it_to_the_workspace(ws)
 def create_schematic(library: de.Library):
     design = db.create_schematic(f"{library_name}:{cell_name}:schematic")
  
-    v = design.add_instance(
-        ("ads_datacmps", "VAR", "symbol"), (3.5, -2.75), name="VAR1", angle=-90
+    # Ladder, ports and VAR block built in one transaction
+    spec = lc_ladder_spec(L, C)
+    spec.components.append(
+        Component(
+            "ads_simulation:S_Param:symbol",
+            (2, 2),
+            params={"Start": "0.01 GHz", "Stop": f"{(fs * 2) / 1e9} GHz", "Step": "0.01 GHz"},
+        )
     )
-    assert v.is_var_instance
-    for i in range(len(L)):
-        ind = design.add_instance("ads_rflib:L:symbol", (i * 2, 0))
-        ind.parameters["L"].value = f"L{i + 1} nH"
-        ind.update_item_annotation()
-        v.vars[f"L{i + 1}"] = f"{L[i]}"
-        design.add_wire([(i * 2 + 1, 0), (i * 2 + 2, 0)])
- 
-    for i in range(len(C)):
-        cap = design.add_instance("ads_rflib:C:symbol", (i * 2 + 1.5, -1), angle=-90)
-        cap.parameters["C"].value = f"C{i + 1} pF"
-        cap.update_item_annotation()
-        v.vars[f"C{i + 1}"] = f"{C[i]}"
-        design.add_wire([(i * 2 + 1.5, 0), (i * 2 + 1.5, -1)])
-        design.add_instance("ads_rflib:GROUND:symbol", (i * 2 + 1.5, -2), angle=-90)
-    del v.vars["X"]
- 
-    design.add_instance("ads_simulation:TermG:symbol", (-1, -1), angle=-90)
-    design.add_wire([(-1, -1), (-1, 0), (0, 0)])
- 
-    design.add_instance("ads_simulation:TermG:symbol", (len(L) * 2 + 1, -1), angle=-90)
-    design.add_wire([(len(L) * 2, 0), (len(L) * 2 + 1, 0.0)])
-    design.add_wire([(len(L) * 2 + 1, 0), (len(L) * 2 + 1, -1.0)])
- 
-    sp = design.add_instance("ads_simulation:S_Param:symbol", (2, 2))
-    sp.parameters["Start"].value = "0.01 GHz"
-    sp.parameters["Stop"].value = f"{(fs * 2) / 1e9} GHz"
-    sp.parameters["Step"].value = "0.01 GHz"
-    sp.update_item_annotation()
-    design.save_design()
+    build_schematic(design, spec)
     return design
  
  
@@ -154,6 +97,13 @@ def create_schematic(library: de.Library):
 design = create_schematic(lib)
  
 netlist = design.generate_netlist()
+# Compare netlist_writer with the schematic's netlist, kept as the golden file
+writer_diff = check_against_schematic(
+    lc_ladder_netlist(L, C, "0.01 GHz", fs * 2, "0.01 GHz", top=f"{library_name}:{cell_name}:schematic"),
+    netlist,
+    os.path.join(GOLDEN_DIR, "5_lumpded_lpf.net"),
+)
+print("netlist_writer matches generate_netlist():", not writer_diff)
 simulator = ads.CircuitSimulator()
 target_output_dir = os.path.join(workspace_path, "data")
 simulator.run_netlist(netlist, output_dir=target_output_dir)
@@ -165,13 +115,24 @@ output_data = dataset.open(
     Path(os.path.join(target_output_dir, f"{cell_name}" + ".ds"))
 )
  
-# Convert SP1.SP datablock to the pandas dataframe
-mydata = output_data["SP1.SP"].to_dataframe().reset_index()
+# Load S21 & S11 from the SP1.SP datablock as NumPy arrays over freq
+mydata = load_varblock(output_data["SP1.SP"], ["S[2,1]", "S[1,1]"])
  
 # Extract data and convert S21 & S11 to dB
-freq = mydata["freq"] / 1e6
-S21 = 20 * np.log10(abs(mydata["S[2,1]"]))
-S11 = 20 * np.log10(abs(mydata["S[1,1]"]))
+freq = mydata.axes["freq"] / 1e6
+S21 = 20 * np.log10(abs(mydata.values["S[2,1]"]))
+S11 = 20 * np.log10(abs(mydata.values["S[1,1]"]))
+ 
+# Check the simulated response against the ripple and rejection spec. L and C
+# are rounded to 4 digits, which moves the ripple by up to ~1e-3 dB, so the
+# check allows that much.
+spec = evaluate_mask(
+    SpecMask(fc=fc, ripple_db=ripple_db, fs=fs, La=La_required),
+    mydata.axes["freq"],
+    mydata.values["S[2,1]"],
+    tol=1e-3,
+)
+print("Spec met:", bool(spec.passed), "| worst margin (dB) =", round(float(spec.margin), 3))
  
 # Plot results using inline plot from matplotlib
 ipython.run_line_magic("matplotlib", "inline")
@@ -1,15 +1,26 @@
 import numpy as np
 import os
 import matplotlib.pyplot as plt
-import shutil
  
  
 from keysight.ads.de import db_uu as db
-import keysight.ads.de as de
 from keysight.ads.de.experimental.text_maker import TextMaker
+from keysight.ads.de.db import LayerId
 import keysight.ads.dataset as dataset
 from keysight.edatoolbox import ads
  
+from lpf_synthesis import lpf_design_by_N
+from microstrip_calc import microstrip_W_fromZ0
+from filter_optimizer import optimize_stepped_impedance, write_vars
+from schematic_builder import Component, VarBlock, build_schematic
+from schematic_router import stepped_impedance_layout
+from layout_generator import build_layout, port_marker, stepped_impedance_geometry
+from spec_mask import SpecMask
+from sim_cache import SimulationCache, simulator_version
+from workspace_utils import ensure_workspace, record_cell, source_hash
+from dataset_utils import load_varblock
+from netlist_writer import GOLDEN_DIR, check_against_schematic, stepped_impedance_netlist
+ 
 # Filter Design Parameters - Set appropriate design specifications
 ripple_db = 0.1  # Passband ripple in dB
 fc = 2000e6  # Passband Cutoff Frequency
@@ -20,55 +31,25 @@ N = 7  # Order of the Filter, choose Odd order only
 Er = 3.66  # Relative Permittivity of the Substrate
 tanD = 0.0023  # Loss Tangent of the Substrate
 H_mm = 0.508  # Height of the substrate in mm
+T_mm = 0.017  # Conductor thickness in mm
 Zhigh = 130  # High Impedance Line Characteristic Impedance
 Zlow = 15  # Low Impedance Line Characteristic Impedance
 Feed_Length = 2 # 50 Ohm feed line length at input and output
  
+# Spec mask the microstrip realization is tuned to. The short-line
+# approximation of the stepped-impedance sections cannot reach the lumped
+# design's ripple_db and La (48 dB for N = 7), so tuning targets what it can
+tune_ripple_db = 0.5  # Passband ripple in dB, relaxed from ripple_db
+tune_La = 30  # Rejection at fs in dB, relaxed from the computed La
+tune_S11_max_db = -15  # Passband return loss limit in dB
+ 
 # ADS Workspace and Design Creation
 wrk_name = "Demo_Python_LPF_wrk"
 lib = "Demo_Python_LPF_lib"
 cell = "cell_lpf1"
 HOME = "C:/ADS_Python_Tutorials/"
- 
- 
-def lpf_design_by_N(ripple_db, fc, fs, R0, N):
-    ep = 10 ** (ripple_db / 10) - 1
-    pi = np.pi
-    wc = 2 * pi * fc  # angular passband freq
-    ws = 2 * pi * fs  # angular stopband freq
- 
-    La = 0 - 10 * np.log10(1 + ep * np.cosh((N * np.arccosh(ws / wc))) ** 2)
-    La = round(La, 2)
- 
-    beta = np.log(1 / np.tanh(ripple_db / 17.37))
- 
-    gamma = np.sinh(beta / (2 * N))
- 
-    L = []
-    C = []
-    ak = []
-    bk = []
-    gk = []
- 
-    for k in range(1, N + 1):
-        a1 = np.sin(((2 * k - 1) * pi) / (2 * N))
-        ak.append(a1)
- 
-        b1 = gamma**2 + (np.sin(k * pi / N)) ** 2
-        bk.append(b1)
- 
-    for k in range(1, N + 1):
-        if k == 1:
-            gk.append(round(2 * ak[k - 1] / gamma, 4))
-        else:
-            gk.append(round((4 * ak[k - 2] * ak[k - 1]) / (bk[k - 2] * gk[k - 2]), 4))
- 
-        if k % 2 != 0:
-            L.append(round(((R0 * gk[k - 1] / wc) / 1e-9), 2))
-        else:
-            C.append(round((gk[k - 1] / (R0 * wc)) / 1e-12, 2))
- 
-    return L, C, N, La, gk
+# Simulation results are reused when the generated netlist is unchanged
+sim_cache = SimulationCache(os.path.join(HOME, "sim_cache"), simulator_version())
  
 # Chebyshev Low Pass Filter Design function
 L, C, N, La, gk = lpf_design_by_N(ripple_db, fc, fs, R0, N)
@@ -78,27 +59,6 @@ print(f"L[1-{len(L)}] = {L} nH")
 print(f"C[1-{len(C)}] = {C} pF")
 print("Estimated Attenuation @", fs / 1e9, "GHz =", La, "dB")
  
-# Compute Microstrip implementation values for LPF design
-def microstrip_calc_fromZ0(Er, H_mm, Z0):
-    Zeff = 40 - 2 * Er
- 
-    if Z0 > Zeff:
-        # High Impedance calculation
-        Heff = Z0 * np.sqrt(2 * (Er + 1)) / 119.9 + 1 / 2 * ((Er - 1) / (Er + 1)) * (
-            np.log(np.pi / 2) + ((1 / Er) * np.log(4 / np.pi))
-        )
-        WH = 1 / (np.exp(Heff) / 8 - 1 / (4 * np.exp(Heff)))
-        calc_w = WH * H_mm
-    else:
-        # Low Impedance calculation
-        der = 59.95 * pow(np.pi, 2) / (Z0 * np.sqrt(Er))
-        WH = (2 / np.pi) * ((der - 1) - np.log(2 * der - 1)) + (
-            (Er - 1) / (np.pi * Er)
-        ) * (np.log(der - 1) + 0.293 - (0.517 / Er))
-        calc_w = WH * H_mm
- 
-    return calc_w
- 
 wlength = 3e11 / (fc * np.sqrt(Er))  # Wavelength in mm
 beta = 2 * np.pi / wlength
  
@@ -111,9 +71,9 @@ for k in range(1, N + 1):
     else:
         Line_C.append(round((gk[k - 1] * Zlow / R0 / beta), 2))
  
-w_ind = round(microstrip_calc_fromZ0(Er, H_mm, Zhigh), 2)
-w_cap = round(microstrip_calc_fromZ0(Er, H_mm, Zlow), 2)
-w50 = round(microstrip_calc_fromZ0(Er, H_mm, R0), 2)
+# Compute Microstrip implementation values for LPF design
+# Widths are refined against the Hammerstad-Jensen model of the MSUB below
+w_ind, w_cap, w50 = np.round(microstrip_W_fromZ0(Er, H_mm, [Zhigh, Zlow, R0], T_mm), 2)
  
 print(f"\nMicrostrip Implementation for {N}th order Chebyshev LPF design:")
 print("Inductive Line Lengths =", Line_L, "mm")
@@ -122,134 +82,72 @@ print("Capacitive Line Lenghts =", Line_C, "mm")
 print("Width of Capacitive Line =", round(w_cap, 2), "mm")
 print("Width of 50 Ohm Microstrip Line =", round(w50, 2), "mm \n")
  
- 
-def create_workspace_and_design_then_simulate_and_plot(
-    wrk_name, lib, cell, HOME
-) -> None:
-    wrk_space_path = os.path.join(HOME, wrk_name)
- 
-    # ensure to start from a closed workspace
-    if de.workspace_is_open():
-        de.close_workspace()
- 
-    # delete the workspace if it exists
-    if os.path.exists(wrk_space_path):
-        shutil.rmtree(wrk_space_path)
- 
-    # create the workspace
-    de.create_workspace(wrk_space_path)
-    wrk_space = de.open_workspace(wrk_space_path)
-    library = de.create_new_library(lib, os.path.join(wrk_space_path, lib))
-    wrk_space.add_library(
-        lib, os.path.join(wrk_space_path, lib), mode=de.LibraryMode.SHARED
-    )
- 
-    library.setup_schematic_tech()
-    library.create_layout_tech_std_ads("millimeter", 10000, False)
+# Tune line lengths and per-section widths against the spec mask with the
+# in-process microstrip model; the tuned values go into VAR1/VAR2
+spec = SpecMask(fc=fc, ripple_db=tune_ripple_db, fs=fs, La=tune_La, S11_max_db=tune_S11_max_db)
+synthesized = {
+    "Line_L": Line_L, "Line_C": Line_C, "w_ind": w_ind, "w_cap": w_cap, "w50": w50,
+    "Er": Er, "H_mm": H_mm, "T_mm": T_mm, "tanD": tanD, "Feed_Length": Feed_Length,
+}
+tuned = optimize_stepped_impedance(synthesized, spec, np.linspace(0.05e9, 1.5 * fs, 300))
+print(f"Tuned design: spec margin {tuned.margin0:+.2f} dB -> {tuned.margin:+.2f} dB \n")
+ 
+# Values and generator code the schematic cell is built from, a change of
+# either triggers a rebuild
+cell_params = {
+    "N": N, "Line_L": Line_L, "Line_C": Line_C, "w_ind": w_ind, "w_cap": w_cap,
+    "w50": w50, "Feed_Length": Feed_Length, "Er": Er, "H_mm": H_mm, "T_mm": T_mm,
+    "tanD": tanD, "fs": fs, "tuned": tuned.values,
+    "generator": source_hash(__file__, build_schematic, stepped_impedance_layout, write_vars, build_layout),
+}
+ 
+ 
+def create_lpf_schematic(lib, cell):
     design = db.create_schematic(lib + ":" + cell + ":" + "schematic")
  
-    v1 = design.add_instance(
-        ("ads_datacmps", "VAR", "symbol"), (3.0, -3.125), name="VAR1", angle=-90
-    )
-    v2 = design.add_instance(
-        ("ads_datacmps", "VAR", "symbol"), (4.75, -3.125), name="VAR2", angle=-90
-    )
-    assert v1.is_var_instance
-    assert v2.is_var_instance
- 
-    design.add_instance(
-        ("ads_simulation", "Term", "symbol"),
-        (-3, -1),
-        name="Term1",
-        angle=-90,
-    )
-    design.add_instance(("ads_rflib", "GROUND", "symbol"), (-3, -2), name="", angle=-90)
-    design.add_wire([(-3.0, -1), (-3.0, 0.0)])
-    design.add_wire([(-3.0, 0), (-1.5, 0.0)])
- 
-    # Add a 50Ohm line at the input
-    lip = design.add_instance(
-        ("ads_tlines", "MLIN", "symbol"), (-1.5, 0), name="IP_50", angle=0
-    )
-    lip.parameters["W"].value = "w50 mm"
-    lip.parameters["L"].value = f"{Feed_Length} mm"
-    design.add_wire([(-0.5, 0.0), (0.0, 0.0)])
- 
-    # Add 50Ohm line at the output
-    lop = design.add_instance(
-        ("ads_tlines", "MLIN", "symbol"),
-        ((3 * N - 1) / 2 + 0.5, 0),
-        name="OP_50",
-        angle=0,
-    )
-    lop.parameters["W"].value = "w50 mm"
-    lop.parameters["L"].value = f"{Feed_Length} mm"
-    design.add_wire([((3 * N - 1) / 2 + 1.5, 0), ((3 * N + 1) / 2 + 2, 0.0)])
+    # Ports, 50Ohm feed lines and the MLIN sections are placed and wired by
+    # the router, so the coordinates follow N
+    layout = stepped_impedance_layout(len(Line_L), len(Line_C), Feed_Length)
  
+    v1_vars, v2_vars = {}, {}
     for i in range(len(Line_L)):
-        tlin_L = design.add_instance(
-            ("ads_tlines", "MLIN", "symbol"),
-            (3 + (i - 1) * 3, 0),
-            name="TL_L" + str(i + 1),
-            angle=0,
-        )
-        tlin_L.parameters["W"].value = "w_ind" + str(i + 1) + " mm"
-        tlin_L.parameters["L"].value = "Line_L" + str(i + 1) + " mm"
-        v1.vars["Line_L" + str(i + 1)] = str(Line_L[i])
-        v1.vars["w_ind" + str(i + 1)] = str(w_ind)
-        design.add_wire([(4 + (i - 1) * 3, 0.0), (4.5 + (i - 1) * 3, 0.0)])
+        v1_vars["Line_L" + str(i + 1)] = str(Line_L[i])
+        v1_vars["w_ind" + str(i + 1)] = str(w_ind)
     for i in range(len(Line_C)):
-        tlin_C = design.add_instance(
-            ("ads_tlines", "MLIN", "symbol"),
-            (4.5 + (i - 1) * 3, 0),
-            name="TL_C" + str(i + 1),
-            angle=0,
-        )
-        design.add_wire([(5.5 + (i - 1) * 3, 0), (6.0 + (i - 1) * 3, 0.0)])
-        tlin_C.parameters["W"].value = "w_cap" + str(i + 1) + " mm"
-        tlin_C.parameters["L"].value = "Line_C" + str(i + 1) + " mm"
-        v2.vars["Line_C" + str(i + 1)] = str(Line_C[i])
-        v2.vars["w_cap" + str(i + 1)] = str(w_cap)
- 
-    del v1.vars["X"]
-    del v2.vars["X"]
-    v2.vars["w50"] = str(w50)
- 
-    design.add_instance(
-        ("ads_simulation", "Term", "symbol"),
-        ((3 * N + 1) / 2 + 2, -1),
-        name="Term2",
-        angle=-90,
-    )
-    design.add_instance(
-        ("ads_rflib", "GROUND", "symbol"),
-        ((3 * N + 1) / 2 + 2, -2),
-        name="",
-        angle=-90,
-    )
- 
-    design.add_wire([((3 * N + 1) / 2 + 1, 0), ((3 * N + 1) / 2 + 2, 0.0)])
-    design.add_wire([((3 * N + 1) / 2 + 2, 0), ((3 * N + 1) / 2 + 2, -1.0)])
- 
-    sp = design.add_instance(
-        ("ads_simulation", "S_Param", "symbol"), (0, -3), name="SP1"
-    )
-    sp.parameters["Start"].value = "0.001 GHz"
-    sp.parameters["Stop"].value = str(fs * 1.5 / 1e9) + " GHz"
-    sp.parameters["Step"].value = str(fs / 1e9 / 400) + " GHz"
- 
-    inst = design.add_instance("ads_tlines:MSUB", name="MSub1", origin=(6.5, -3.5))
-    inst.parameters["H"].value = str(H_mm) + " mm"
-    inst.parameters["Er"].value = str(Er)
-    inst.parameters["Cond"].value = "5.8E7"
-    inst.parameters["Hu"].value = "1e+33 mm"
-    inst.parameters["T"].value = "0.017 mm"
-    inst.parameters["TanD"].value = str(tanD)
-    inst.parameters["Rough"].value = "0 mm"
-    inst.parameters["DielectricLossModel"].value = "1"
-    inst.parameters["RoughnessModel"].value = "2"
-    inst.invoke_item_parameter_changed_callback(["H"])
-    inst.update_item_annotation()
+        v2_vars["Line_C" + str(i + 1)] = str(Line_C[i])
+        v2_vars["w_cap" + str(i + 1)] = str(w_cap)
+    v2_vars["w50"] = str(w50)
+ 
+    layout.place(Component(
+        ("ads_simulation", "S_Param", "symbol"), (0, -3), "SP1",
+        params={
+            "Start": "0.001 GHz",
+            "Stop": str(fs * 1.5 / 1e9) + " GHz",
+            "Step": str(fs / 1e9 / 400) + " GHz",
+        },
+    ))
+    layout.place(Component(
+        "ads_tlines:MSUB", (6.5, -3.5), "MSub1",
+        params={
+            "H": str(H_mm) + " mm",
+            "Er": str(Er),
+            "Cond": "5.8E7",
+            "Hu": "1e+33 mm",
+            "T": str(T_mm) + " mm",
+            "TanD": str(tanD),
+            "Rough": "0 mm",
+            "DielectricLossModel": "1",
+            "RoughnessModel": "2",
+        },
+        callbacks=("H",),
+    ))
+ 
+    spec = layout.spec(vars=[
+        VarBlock("VAR1", (3.0, -3.125), v1_vars),
+        VarBlock("VAR2", (4.75, -3.125), v2_vars),
+    ])
+    report = build_schematic(design, spec, save=False)
+    write_vars(tuned.values, report.instances["VAR1"], report.instances["VAR2"])
  
     # Place desired text on ADS Schematic
     layer_id = db.LayerId(231 if design.is_schematic is True else 1)
@@ -268,21 +166,68 @@ def create_workspace_and_design_then_simulate_and_plot(
     # text_maker.add_text(layer_id, "Expected Rejection at "+str(fs/1e9)+" GHz : "+str(La2)+ " dB", (0.0,1.1))
  
     design.save_design()
+    return design
+ 
+ 
+# Physical layout of the tuned filter in the layout view of the same cell,
+# drawn as one merged conductor outline on "cond:drawing" with the P1/P2
+# ports marked on "cond:pin"
+def create_lpf_layout(library, lib, cell):
+    layout = db.create_layout(lib + ":" + cell + ":" + "layout")
+    cond = LayerId.create_layer_id_from_library(library, "cond", "drawing")
+    pin = LayerId.create_layer_id_from_library(library, "cond", "pin")
+    geometry = stepped_impedance_geometry(
+        Line_L, Line_C, w_ind, w_cap, w50, Feed_Length, values=tuned.values
+    )
+    build_layout(layout, geometry, cond, merge=True, add_port=port_marker(pin))
+    return layout
+ 
+ 
+def create_workspace_and_design_then_simulate_and_plot(
+    wrk_name, lib, cell, HOME
+) -> None:
+    wrk_space_path = os.path.join(HOME, wrk_name)
+ 
+    # reuse the workspace if its setup is unchanged, rebuild the cell only if
+    # the design values it is generated from changed
+    library, stale_cells = ensure_workspace(
+        wrk_space_path,
+        lib,
+        cells={cell: cell_params},
+        layout_tech=("std_ads", "millimeter", 10000, False),
+    )
+    if cell in stale_cells:
+        design = create_lpf_schematic(lib, cell)
+        create_lpf_layout(library, lib, cell)
+        record_cell(wrk_space_path, cell, cell_params)
+    else:
+        design = db.open_design(lib + ":" + cell + ":" + "schematic")
  
     netlist = design.generate_netlist()
+    # Compare netlist_writer with the schematic's netlist, kept as the golden file
+    writer_diff = check_against_schematic(
+        stepped_impedance_netlist(
+            Line_L, Line_C, w_ind, w_cap, w50, Er, H_mm, T_mm, tanD, Feed_Length,
+            "0.001 GHz", str(fs * 1.5 / 1e9) + " GHz", str(fs / 1e9 / 400) + " GHz",
+            values=tuned.values, top=lib + ":" + cell + ":" + "schematic",
+        ),
+        netlist,
+        os.path.join(GOLDEN_DIR, "5_microstrip_lpf.net"),
+    )
+    print("netlist_writer matches generate_netlist():", not writer_diff)
     simulator = ads.CircuitSimulator()
     output_dir = os.path.join(HOME, wrk_name, "data")
-    simulator.run_netlist(netlist, output_dir=output_dir)
+    sim_cache.run_netlist(simulator, netlist, output_dir)
  
     # ipython = getipython.get_ipython()
     data = dataset.open(os.path.join(output_dir, cell + ".ds"))
  
     # Create a line plot
-    df = data["SP1.SP"].to_dataframe().reset_index()
+    sp = load_varblock(data["SP1.SP"], ["S[2,1]", "S[1,1]"])
  
-    myf = df["freq"] / 1e9
-    S21 = 20 * np.log10(abs(df["S[2,1]"]))
-    S11 = 20 * np.log10(abs(df["S[1,1]"]))
+    myf = sp.axes["freq"] / 1e9
+    S21 = 20 * np.log10(abs(sp.values["S[2,1]"]))
+    S11 = 20 * np.log10(abs(sp.values["S[1,1]"]))
  
     plt.plot(myf, S21, color="blue", label="S21")
     plt.plot(myf, S11, color="red", label="S11")
@@ -1,15 +1,14 @@
 import os
-import shutil
-import seaborn as sns
 import matplotlib.pyplot as plt
 import warnings
  
-import keysight.ads.de as de
 from keysight.ads.de import db_uu
 from keysight.ads.de.db_uu import Transaction
 from keysight.ads.de import PointF
 from keysight.edatoolbox import ads
-import keysight.ads.dataset as dataset
+ 
+from workspace_utils import ensure_workspace, record_cell, source_hash
+from dataset_utils import IndexedDataset, export_varblock, iter_export_slices, open_export
  
 warnings.simplefilter("ignore", DeprecationWarning)
  
@@ -28,38 +27,29 @@ pdk_tech_loc="examples/DesignKit/DemoKit_Non_Linear/DemoKit_Non_Linear_v2.0/Demo
 pdk_path = os.path.join(ads_install_dir, pdk_loc)
 pdk_tech_path = os.path.join(ads_install_dir, pdk_tech_loc)
  
- 
-def create_workspace(wrk_path, lib, lib_path) -> de.Library:
-    # Check if the workspace exists and delete it if it does
-    if os.path.exists(wrk_path):
-        shutil.rmtree(wrk_path)
- 
-    # Create the workspace
-    de.create_workspace(wrk_path)
-    # Open the workspace
-    wrk_space = de.open_workspace(wrk_path)
- 
-    # Create the library
-    library = de.create_new_library(lib, lib_path)
- 
-    wrk_space.add_library(lib, lib_path, mode=de.LibraryMode.SHARED)
- 
-    wrk_space.add_library("DemoKit_Non_Linear", pdk_path, mode=de.LibraryMode.READ_ONLY)
-    wrk_space.add_library(
-        "DemoKit_Non_Linear_tech", pdk_tech_path, mode=de.LibraryMode.READ_ONLY
-    )
-    open_pdk_lib = wrk_space.open_library(
-        "DemoKit_Non_Linear", pdk_path, mode=de.LibraryMode.READ_ONLY
+# Sweep settings the DC-IV schematic is generated from: (start, stop, step)
+# of the DC1 VDS sweep and the Sweep1 VGS sweep, and the FET model and nf
+dciv_params = {"VDS": (0, 5, 0.1), "VGS": (-2.4, 0, 0.2), "model": "model21", "nf": 4}
+# A change of the settings or of this script triggers a rebuild
+cell_params = {**dciv_params, "generator": source_hash(__file__)}
+ 
+ 
+def create_workspace(wrk_path, lib, lib_path):
+    # Reuse the workspace if it was set up with the same library and PDK,
+    # otherwise delete and rebuild it
+    library, stale_cells = ensure_workspace(
+        wrk_path,
+        lib,
+        cells={cell: cell_params},
+        layout_tech=("pdk", "DemoKit_Non_Linear"),
+        pdk_libs=[
+            ("DemoKit_Non_Linear", pdk_path),
+            ("DemoKit_Non_Linear_tech", pdk_tech_path),
+        ],
     )
+    return library, stale_cells
  
-    # Create schematic and layout technology
- 
-    library.setup_schematic_tech()
-    library.create_layout_tech_from_pdk(open_pdk_lib, copy_tech=False)
- 
-    return library
- 
-wrk_lib = create_workspace(wrk_path, lib, lib_path)
+wrk_lib, stale_cells = create_workspace(wrk_path, lib, lib_path)
  
 def create_dciv_schematic(library, cell):
     # Create a schematic cell
@@ -79,8 +69,8 @@ def create_dciv_schematic(library, cell):
         inst = dst_design.add_instance(
             "DemoKit_Non_Linear:demo_fet2", name="M1", origin=(1.875, 0.0)
         )
-        inst.parameters["model"].value = "model21"
-        inst.parameters["nf"].value = "4"
+        inst.parameters["model"].value = dciv_params["model"]
+        inst.parameters["nf"].value = str(dciv_params["nf"])
         inst.invoke_item_parameter_changed_callback(["nf"])
         inst.update_item_annotation()
  
@@ -88,9 +78,10 @@ def create_dciv_schematic(library, cell):
             "ads_simulation:DC", name="DC1", origin=(0.25, -1.875)
         )
         inst.parameters["SweepVar"].value = '"VDS"'
-        inst.parameters["Start"].value = "0"
-        inst.parameters["Stop"].value = "5"
-        inst.parameters["Step"].value = "0.1"
+        start, stop, step = dciv_params["VDS"]
+        inst.parameters["Start"].value = str(start)
+        inst.parameters["Stop"].value = str(stop)
+        inst.parameters["Step"].value = str(step)
         inst.parameters["Sort"].value = "LINEAR START STEP "
         inst.update_item_annotation()
  
@@ -106,9 +97,10 @@ def create_dciv_schematic(library, cell):
         )
         inst.parameters["SweepVar"].value = '"VGS"'
         inst.parameters["SimInstanceName"].repeats[0].value = '"DC1"'
-        inst.parameters["Start"].value = "-2.4"
-        inst.parameters["Stop"].value = "0"
-        inst.parameters["Step"].value = "0.2"
+        start, stop, step = dciv_params["VGS"]
+        inst.parameters["Start"].value = str(start)
+        inst.parameters["Stop"].value = str(stop)
+        inst.parameters["Step"].value = str(step)
         inst.update_item_annotation()
  
         inst = dst_design.add_var_instance(name="VAR1", origin=(-4.375, -0.625))
@@ -168,7 +160,9 @@ def create_dciv_schematic(library, cell):
  
         dst_design.save_design()
  
-create_dciv_schematic(wrk_lib, cell)
+if cell in stale_cells:
+    create_dciv_schematic(wrk_lib, cell)
+    record_cell(wrk_path, cell, cell_params)
  
 def create_netlist_run_simulation(lib_name, cell_name, view_name) -> None:
     # Open the schematic design
@@ -187,32 +181,22 @@ dataset_dir = create_netlist_run_simulation(lib, cell, "schematic")
  
 def plot_dciv_data(output_dir, cell_name):
      
-    data = dataset.open(os.path.join(output_dir, cell_name + ".ds"))
+    data = IndexedDataset(os.path.join(output_dir, cell_name + ".ds"))
  
-    #Inspect available data blocks in the dataset
-    for datablock in data.find_varblocks_with_var_name("IDS.i"):
-        dciv=datablock.name
+    #Find the data block holding IDS.i
+    dciv = data.find_varblock("IDS.i")
  
-    # Create a line plot
-    df = data[dciv].to_dataframe().reset_index()
-     
-    # Convert IDS.i from A to mA
-    df["IDS.i"] = df["IDS.i"] * 1000  # Scale current to mA
-    warnings.simplefilter(action="ignore", category=FutureWarning)
-    warnings.simplefilter(action="ignore", category=DeprecationWarning)
- 
-    # Format the VGS column to 4 decimal places
-    df["VGS"] = df["VGS"].map(lambda x: f"{x:.2f}")
+    # Export IDS.i once as raw arrays, then plot one VGS curve at a time from
+    # the export so only a single slice is held in memory
+    export_dir = export_varblock(data[dciv], ["IDS.i"], os.path.join(output_dir, cell_name + "_dciv"), dciv)
+    vds = open_export(export_dir, names=()).axes["VDS"]
  
     # Plot DC IV characteristics
     plt.figure(figsize=(10, 6))
-    sns.lineplot(
-        data=df,
-        x="VDS",  # Replace with the actual column name for VDS in your dataframe
-        y="IDS.i",  # Replace with the actual column name for IDS.i in your dataframe
-        hue="VGS",  # Replace with the actual column name for VGS in your dataframe
-        palette="tab10",
-    )
+    colors = plt.get_cmap("tab10")
+    for k, (vgs, dciv_slice) in enumerate(iter_export_slices(export_dir, ["IDS.i"])):
+        # Convert IDS.i from A to mA
+        plt.plot(vds, dciv_slice["IDS.i"] * 1000, color=colors(k % 10), label=f"{vgs:.2f}")
     plt.ylabel("Drain Current - Ids (mA)")
     plt.xlabel("Drain Voltage - Vds (V)")
     plt.title("DC-IV Characteristics")
@@ -0,0 +1,189 @@
+import numpy as np
+
+from microstrip_calc import microstrip_Z0
+
+c0 = 299792458.0  # Speed of light in m/s
+
+
+# Frequency points of a linear S_Param sweep (Start/Stop/Step in Hz),
+# including Stop when it falls on the grid as ADS does
+def freq_grid(start, stop, step):
+    n = int(np.floor((stop - start) / step + 1e-9)) + 1
+    return start + step * np.arange(n)
+
+
+# ABCD matrices have shape (..., 2, 2) where the leading axes are the design
+# batch and the frequency grid; cascading is a batched matrix product.
+def series_abcd(Z):
+    Z = np.asarray(Z, dtype=complex)
+    abcd = np.zeros(Z.shape + (2, 2), dtype=complex)
+    abcd[..., 0, 0] = 1
+    abcd[..., 0, 1] = Z
+    abcd[..., 1, 1] = 1
+    return abcd
+
+
+def shunt_abcd(Y):
+    Y = np.asarray(Y, dtype=complex)
+    abcd = np.zeros(Y.shape + (2, 2), dtype=complex)
+    abcd[..., 0, 0] = 1
+    abcd[..., 1, 0] = Y
+    abcd[..., 1, 1] = 1
+    return abcd
+
+
+# Transmission line section with characteristic impedance Z0 and complex
+# electrical length gamma * length
+def tline_abcd(Z0, gl):
+    A, B, C, D = _tline_terms(Z0, gl)
+    abcd = np.empty(A.shape + (2, 2), dtype=complex)
+    abcd[..., 0, 0] = A
+    abcd[..., 0, 1] = B
+    abcd[..., 1, 0] = C
+    abcd[..., 1, 1] = D
+    return abcd
+
+
+# A, B, C, D of a line as separate arrays. cosh/sinh of gl = a + jb are
+# expanded into real cos/sin/cosh/sinh, which is much cheaper than complex
+# transcendental functions on large batches.
+def _tline_terms(Z0, gl):
+    Z0 = np.asarray(Z0, dtype=complex)
+    gl = np.asarray(gl, dtype=complex)
+    a, b = gl.real, gl.imag
+    cos_b, sin_b = np.cos(b), np.sin(b)
+    cosh_a, sinh_a = np.cosh(a), np.sinh(a)
+    ch = np.empty(gl.shape, dtype=complex)
+    ch.real = cosh_a * cos_b
+    ch.imag = sinh_a * sin_b
+    sh = np.empty(gl.shape, dtype=complex)
+    sh.real = sinh_a * cos_b
+    sh.imag = cosh_a * sin_b
+    ch, Z0 = np.broadcast_arrays(ch, Z0)
+    return ch, Z0 * sh, sh * (1 / Z0), ch
+
+
+# Product of two ABCD matrices given as (A, B, C, D) tuples. Elementwise on
+# contiguous arrays this is several times faster than a batched matmul of
+# (..., 2, 2) stacks.
+def _mul_terms(x, y):
+    xA, xB, xC, xD = x
+    yA, yB, yC, yD = y
+    return (xA * yA + xB * yC, xA * yB + xB * yD, xC * yA + xD * yC, xC * yB + xD * yD)
+
+
+# S-parameters of a two-port from its ABCD matrix, both ports terminated in R0.
+# Returns S11, S21 with the shape of the leading axes.
+def abcd_to_s(abcd, R0=50):
+    return _terms_to_s(abcd[..., 0, 0], abcd[..., 0, 1], abcd[..., 1, 0], abcd[..., 1, 1], R0)
+
+
+def _terms_to_s(A, B, C, D, R0):
+    denom = A + B / R0 + C * R0 + D
+    S11 = (A + B / R0 - C * R0 - D) / denom
+    S21 = 2 / denom
+    return S11, S21
+
+
+# Lumped Chebyshev ladder: series L (nH) and shunt C (pF) alternating as
+# L1 C1 L2 C2 ... like the schematics in 3_, 4_ and 5_lumpded_. L_nH and C_pF
+# have shape batch_shape + (n,); NaN entries (padding from lpf_design_batch)
+# are skipped. Returns S11, S21 of shape batch_shape + (len(freq),).
+def lc_ladder_sparams(L_nH, C_pF, freq, R0=50):
+    L_nH = np.asarray(L_nH, dtype=float)
+    C_pF = np.asarray(C_pF, dtype=float)
+    freq = np.asarray(freq, dtype=float)
+    w = 2 * np.pi * freq
+    batch = np.broadcast_shapes(L_nH.shape[:-1], C_pF.shape[:-1])
+
+    abcd = np.broadcast_to(np.eye(2, dtype=complex), batch + freq.shape + (2, 2))
+    for k in range(max(L_nH.shape[-1], C_pF.shape[-1])):
+        if k < L_nH.shape[-1]:
+            L = np.broadcast_to(L_nH[..., k], batch)[..., None] * 1e-9
+            Z = np.where(np.isnan(L), 0, 1j * w * L)
+            abcd = abcd @ series_abcd(Z)
+        if k < C_pF.shape[-1]:
+            C = np.broadcast_to(C_pF[..., k], batch)[..., None] * 1e-12
+            Y = np.where(np.isnan(C), 0, 1j * w * C)
+            abcd = abcd @ shunt_abcd(Y)
+    return abcd_to_s(abcd, R0)
+
+
+# A, B, C, D of an MLIN section over freq with the Hammerstad-Jensen
+# Z0/eps_eff and dielectric loss from tanD; conductor loss, dispersion and
+# step discontinuities are not modelled. A NaN length is a through.
+def _mlin_terms(W_mm, length_mm, Er, H_mm, T_mm, tanD, freq):
+    Er_b = np.asarray(Er, dtype=float)[..., None]
+    Z0, eps_eff = microstrip_Z0(
+        np.asarray(W_mm, dtype=float)[..., None],
+        np.asarray(H_mm, dtype=float)[..., None],
+        Er_b,
+        np.asarray(T_mm, dtype=float)[..., None],
+    )
+    k0 = 2 * np.pi * freq / c0
+    beta = k0 * np.sqrt(eps_eff)
+    # Dielectric attenuation constant in Np/m
+    with np.errstate(invalid="ignore", divide="ignore"):
+        alpha = np.where(
+            Er_b > 1,
+            k0 * Er_b * (eps_eff - 1) * np.asarray(tanD)[..., None]
+            / (2 * np.sqrt(eps_eff) * (Er_b - 1)),
+            0.0,
+        )
+    length = np.asarray(length_mm, dtype=float)[..., None] * 1e-3
+    gl = np.where(np.isnan(length), 0, (alpha + 1j * beta) * np.nan_to_num(length))
+    return _tline_terms(Z0, gl)
+
+
+# Microstrip stepped-impedance LPF as built in 5_microstrip_ and 6_: a 50 Ohm
+# feed line, alternating high impedance (Line_L, w_ind) and low impedance
+# (Line_C, w_cap) MLIN sections, and a 50 Ohm output line. Lengths and widths
+# are in mm. Line_L/Line_C may carry a batch axis (NaN entries are skipped) and
+# Er/H_mm/widths may be batched to match.
+def stepped_impedance_sparams(
+    Line_L, Line_C, w_ind, w_cap, w50, Er, H_mm, freq,
+    T_mm=0.0, tanD=0.0, Feed_Length=2, R0=50,
+):
+    Line_L = np.asarray(Line_L, dtype=float)
+    Line_C = np.asarray(Line_C, dtype=float)
+    freq = np.asarray(freq, dtype=float)
+    batch = np.broadcast_shapes(
+        Line_L.shape[:-1], Line_C.shape[:-1],
+        *(np.shape(x) for x in (w_ind, w_cap, w50, Er, H_mm, T_mm, tanD)),
+    )
+
+    def section(W_mm, length_mm):
+        return _mlin_terms(W_mm, length_mm, Er, H_mm, T_mm, tanD, freq)
+
+    terms = section(w50, Feed_Length)
+    for k in range(max(Line_L.shape[-1], Line_C.shape[-1])):
+        if k < Line_L.shape[-1]:
+            terms = _mul_terms(terms, section(w_ind, Line_L[..., k]))
+        if k < Line_C.shape[-1]:
+            terms = _mul_terms(terms, section(w_cap, Line_C[..., k]))
+    terms = _mul_terms(terms, section(w50, Feed_Length))
+    shape = batch + freq.shape
+    return _terms_to_s(*(np.broadcast_to(t, shape) for t in terms), R0)
+
+
+# Cascade of MLIN sections in order from port 1, each with its own width and
+# length: W_mm and L_mm have shape batch_shape + (n_sections,), NaN lengths are
+# skipped. Used where every section is tuned separately, e.g. the per-section
+# w_ind1/w_cap1... VARs of 5_microstrip_.
+def mlin_cascade_sparams(W_mm, L_mm, Er, H_mm, freq, T_mm=0.0, tanD=0.0, R0=50):
+    W_mm = np.asarray(W_mm, dtype=float)
+    L_mm = np.asarray(L_mm, dtype=float)
+    freq = np.asarray(freq, dtype=float)
+    batch = np.broadcast_shapes(
+        W_mm.shape[:-1], L_mm.shape[:-1], *(np.shape(x) for x in (Er, H_mm, T_mm, tanD))
+    )
+
+    n = np.broadcast_shapes(W_mm.shape[-1:], L_mm.shape[-1:])[0]
+    W_mm = np.broadcast_to(W_mm, W_mm.shape[:-1] + (n,))
+    L_mm = np.broadcast_to(L_mm, L_mm.shape[:-1] + (n,))
+
+    terms = _mlin_terms(W_mm[..., 0], L_mm[..., 0], Er, H_mm, T_mm, tanD, freq)
+    for k in range(1, n):
+        terms = _mul_terms(terms, _mlin_terms(W_mm[..., k], L_mm[..., k], Er, H_mm, T_mm, tanD, freq))
+    shape = batch + freq.shape
+    return _terms_to_s(*(np.broadcast_to(t, shape) for t in terms), R0)
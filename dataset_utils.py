@@ -0,0 +1,269 @@
+import json
+import os
+import shutil
+from collections import namedtuple
+
+import numpy as np
+
+
+# Sweep axes (independent variable name -> 1-D values, in dimension order) and
+# the requested dependent variables as N-D arrays over those axes
+SweepArrays = namedtuple("SweepArrays", ["axes", "values"])
+
+
+# Load selected variables of a dataset varblock as N-D NumPy arrays.
+# The varblock frame is indexed by its independent variables (e.g. Er, freq);
+# instead of reset_index() copying it to long form, the index codes are used to
+# scatter each requested column straight into a contiguous array of shape
+# (len(axis_0), len(axis_1), ...). Complex columns such as S-parameters come
+# back as complex128, real ones as float64. Points missing from a non
+# rectangular sweep are NaN.
+def load_varblock(varblock, names):
+    df = varblock.to_dataframe()
+    index = df.index
+    if hasattr(index, "levels"):
+        axes = {name: np.asarray(level) for name, level in zip(index.names, index.levels)}
+        codes = tuple(np.asarray(c) for c in index.codes)
+    else:
+        axis, code = np.unique(np.asarray(index), return_inverse=True)
+        axes = {index.name: axis}
+        codes = (code,)
+    shape = tuple(len(a) for a in axes.values())
+
+    values = {}
+    for name in names:
+        column = df[name].to_numpy()
+        dtype = np.complex128 if np.iscomplexobj(column) else np.float64
+        out = np.full(shape, np.nan, dtype=dtype)
+        out[codes] = column
+        values[name] = out
+    del df
+    return SweepArrays(axes, values)
+
+
+class AmbiguousVariableError(LookupError):
+    pass
+
+
+# Bumped when the entries of the cached index change, so older caches rebuild
+_INDEX_FORMAT = 2
+
+
+# Dataset wrapper with a one-time inverted index of variable name -> varblocks.
+# The index (varblock, dtype, sweep axes and shape per variable) is built from
+# the independent and dependent variable metadata of every varblock, reading
+# only the sweep axes and no dependent data, and cached as JSON next to the .ds
+# file, keyed by the file's mtime and size, so later opens and lookups cost a
+# dict access.
+# Lookups raise KeyError for unknown names and AmbiguousVariableError when a
+# name lives in several varblocks, unless `within` picks one of them.
+class IndexedDataset:
+    def __init__(self, path, data=None):
+        if data is None:
+            import keysight.ads.dataset as dataset
+
+            data = dataset.open(path)
+        self.path = str(path)
+        self.data = data
+        self.index = self._load_or_build_index()
+
+    def __getitem__(self, varblock_name):
+        return self.data[varblock_name]
+
+    @property
+    def varblock_names(self):
+        return self.data.varblock_names
+
+    def info(self, var_name, within=None):
+        entries = self.index.get(var_name)
+        if not entries:
+            raise KeyError(f"Variable {var_name!r} not found in {self.path}")
+        if within is not None:
+            entries = [e for e in entries if e["varblock"] == within]
+            if not entries:
+                raise KeyError(f"Variable {var_name!r} not found in varblock {within!r}")
+        if len(entries) > 1:
+            names = ", ".join(e["varblock"] for e in entries)
+            raise AmbiguousVariableError(f"Variable {var_name!r} found in several varblocks: {names}")
+        return entries[0]
+
+    def find_varblock(self, var_name, within=None):
+        return self.info(var_name, within)["varblock"]
+
+    def varblock(self, var_name, within=None):
+        return self.data[self.find_varblock(var_name, within)]
+
+    def _index_path(self):
+        return self.path + ".varindex.json"
+
+    def _load_or_build_index(self):
+        stat = os.stat(self.path)
+        key = [stat.st_mtime_ns, stat.st_size, _INDEX_FORMAT]
+        try:
+            with open(self._index_path()) as f:
+                cached = json.load(f)
+            if cached.get("key") == key:
+                return cached["index"]
+        except (OSError, ValueError):
+            pass
+
+        index = {}
+        for name in self.data.varblock_names:
+            varblock = self.data[name]
+            axes = [str(v.name) for v in varblock.ivars]
+            shape = [len(v.values) for v in varblock.ivars]
+            for var in varblock.dvars:
+                index.setdefault(str(var.name), []).append(
+                    {"varblock": name, "dtype": str(np.dtype(var.dtype)), "axes": axes, "shape": shape}
+                )
+
+        try:
+            with open(self._index_path(), "w") as f:
+                json.dump({"key": key, "index": index}, f)
+        except OSError:
+            pass  # read-only location, keep the index in memory only
+        return index
+
+
+# Yield one slice of the outermost sweep variable at a time from a varblock as
+# (value, SweepArrays) with the remaining axes, e.g. one Er value of an
+# Er x freq sweep or one VGS curve of a VGS x VDS sweep. The slices are views
+# of load_varblock(), which loads the whole varblock; to hold only one slice,
+# export the varblock once with export_varblock() and stream it with
+# iter_export_slices() as 6_ and 7_ do.
+def iter_varblock_slices(varblock, names):
+    sweep = load_varblock(varblock, names)
+    axes = list(sweep.axes.items())
+    if len(axes) < 2:
+        yield None, sweep
+        return
+    inner = dict(axes[1:])
+    for i, value in enumerate(axes[0][1]):
+        yield value, SweepArrays(inner, {name: values[i] for name, values in sweep.values.items()})
+
+
+# Yield chunks of rows_per_chunk slices along the first axis of a .npy file,
+# read with plain file reads so memory stays bounded by one chunk regardless
+# of the file size. Each chunk is (start_row, array).
+def iter_npy_slices(path, rows_per_chunk=1):
+    with open(path, "rb") as f:
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        if fortran_order and len(shape) > 1:
+            raise ValueError(f"Fortran ordered arrays cannot be streamed by rows: {path}")
+
+        row_shape = shape[1:]
+        row_size = int(np.prod(row_shape, dtype=np.int64))
+        for start in range(0, shape[0] if shape else 1, rows_per_chunk):
+            rows = min(rows_per_chunk, shape[0] - start) if shape else 1
+            chunk = np.fromfile(f, dtype=dtype, count=rows * row_size)
+            yield start, chunk.reshape((rows,) + row_shape)
+
+
+EXPORT_SCHEMA = "schema.json"
+
+
+# Write a SweepArrays (e.g. from load_varblock, possibly with derived values
+# added) to out_dir as one raw .npy file per axis and variable plus a small
+# JSON schema naming them. The directory is written next to out_dir and moved
+# into place, so readers never see a partial export.
+def export_sweep(sweep, out_dir, varblock=None):
+    tmp = f"{out_dir}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp, ignore_errors=True)
+    os.makedirs(tmp)
+
+    schema = {"varblock": varblock, "axes": [], "variables": []}
+    for i, (name, values) in enumerate(sweep.axes.items()):
+        file = f"axis_{i}.npy"
+        np.save(os.path.join(tmp, file), np.ascontiguousarray(values))
+        schema["axes"].append({"name": name, "file": file, "size": len(values)})
+    for i, (name, values) in enumerate(sweep.values.items()):
+        file = f"var_{i}.npy"
+        values = np.ascontiguousarray(values)
+        np.save(os.path.join(tmp, file), values)
+        schema["variables"].append(
+            {"name": name, "file": file, "dtype": values.dtype.str, "shape": list(values.shape)}
+        )
+    with open(os.path.join(tmp, EXPORT_SCHEMA), "w") as f:
+        json.dump(schema, f, indent=2)
+
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.replace(tmp, out_dir)
+    return out_dir
+
+
+def export_varblock(varblock, names, out_dir, varblock_name=None):
+    return export_sweep(load_varblock(varblock, names), out_dir, varblock_name)
+
+
+# Open an export written by export_sweep. Variables are memory-mapped
+# read-only, so opening costs a header read per file and data is paged in
+# only when touched. names selects a subset of the variables.
+def open_export(out_dir, names=None):
+    with open(os.path.join(out_dir, EXPORT_SCHEMA)) as f:
+        schema = json.load(f)
+    axes = {a["name"]: np.load(os.path.join(out_dir, a["file"])) for a in schema["axes"]}
+    values = {
+        v["name"]: np.load(os.path.join(out_dir, v["file"]), mmap_mode="r")
+        for v in schema["variables"]
+        if names is None or v["name"] in names
+    }
+    return SweepArrays(axes, values)
+
+
+# Stream an export along its first sweep axis with bounded memory, yielding
+# (axis_value, {name: slice}) for the requested variables. The remaining axes
+# are in open_export(out_dir, names=()).axes.
+def iter_export_slices(out_dir, names):
+    with open(os.path.join(out_dir, EXPORT_SCHEMA)) as f:
+        schema = json.load(f)
+    files = {v["name"]: v["file"] for v in schema["variables"]}
+    outer = np.load(os.path.join(out_dir, schema["axes"][0]["file"]))
+    readers = {name: iter_npy_slices(os.path.join(out_dir, files[name])) for name in names}
+    for value in outer:
+        yield value, {name: next(reader)[1][0] for name, reader in readers.items()}
+
+
+# Peak RSS of streaming min/max dB over an (n_slices, n_freq) complex S21 file
+def _bench_streaming_worker(path):
+    import resource
+
+    lo, hi = np.inf, -np.inf
+    for _, chunk in iter_npy_slices(path):
+        s21_db = 20 * np.log10(np.abs(chunk))
+        lo = min(lo, s21_db.min())
+        hi = max(hi, s21_db.max())
+    print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+
+
+# Benchmark: python dataset_utils.py [n_slices ...]
+if __name__ == "__main__":
+    import subprocess
+    import sys
+    import tempfile
+
+    if len(sys.argv) > 2 and sys.argv[1] == "--worker":
+        _bench_streaming_worker(sys.argv[2])
+        sys.exit()
+
+    n_freq = 100000
+    sizes = [int(float(s)) for s in sys.argv[1:]] or [10, 100, 1000]
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_slices in sizes:
+            path = os.path.join(tmp, "S21.npy")
+            # Written slice by slice so this process stays small as well, Linux
+            # carries the peak RSS of the parent over into the worker
+            with open(path, "wb") as f:
+                header = {"descr": "<c16", "fortran_order": False, "shape": (n_slices, n_freq)}
+                np.lib.format.write_array_header_1_0(f, header)
+                for i in range(n_slices):
+                    (np.exp(-1j * np.linspace(0, 10, n_freq)) / (1 + i)).tofile(f)
+
+            rss = subprocess.run(
+                [sys.executable, __file__, "--worker", path], capture_output=True, text=True, check=True
+            ).stdout.strip()
+            size_mb = n_slices * n_freq * 16 / 1e6
+            print(f"{n_slices:>6d} slices ({size_mb:8.1f} MB): peak RSS {int(rss) / 1024:7.1f} MB")
@@ -0,0 +1,180 @@
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from abcd_cascade import mlin_cascade_sparams
+from spec_mask import evaluate_mask, point_margins
+
+# values maps VAR names (Line_L1, w_ind1, ..., Line_C1, w_cap1, ...) to the
+# tuned values in mm, margin is the worst spec margin (dB) of the tuned design
+# and margin0 that of the starting point
+OptimizeResult = namedtuple(
+    "OptimizeResult", ["values", "margin", "margin0", "cost", "n_iter", "n_evals"]
+)
+
+
+# Names of the tuned VARs in the order of the parameter vector, matching the
+# VAR1/VAR2 instances of 5_microstrip_lpf_synthesis.py
+def var_names(n_ind, n_cap):
+    names = []
+    for i in range(n_ind):
+        names += [f"Line_L{i + 1}", f"w_ind{i + 1}"]
+    for i in range(n_cap):
+        names += [f"Line_C{i + 1}", f"w_cap{i + 1}"]
+    return names
+
+
+# Starting parameter vector from a synthesized design (the dict used by
+# yield_analysis: Line_L, Line_C, w_ind, w_cap, w50 and the substrate), where
+# w_ind/w_cap may be one width for all sections or one per section
+def _initial_x(design):
+    n_ind, n_cap = len(design["Line_L"]), len(design["Line_C"])
+    w_ind = np.broadcast_to(np.asarray(design["w_ind"], dtype=float), (n_ind,))
+    w_cap = np.broadcast_to(np.asarray(design["w_cap"], dtype=float), (n_cap,))
+    x = np.concatenate([
+        np.column_stack([design["Line_L"], w_ind]).ravel(),
+        np.column_stack([design["Line_C"], w_cap]).ravel(),
+    ])
+    return x.astype(float)
+
+
+# Section widths and lengths in cascade order (feed, L1, C1, L2, ..., feed)
+# for a batch of parameter vectors of shape (batch, n_params)
+def _sections(x, design):
+    n_ind, n_cap = len(design["Line_L"]), len(design["Line_C"])
+    L = x[:, :2 * n_ind].reshape(-1, n_ind, 2)
+    C = x[:, 2 * n_ind:].reshape(-1, n_cap, 2)
+    lengths, widths = [], []
+    for k in range(max(n_ind, n_cap)):
+        for part, n in ((L, n_ind), (C, n_cap)):
+            if k < n:
+                lengths.append(part[:, k, 0])
+                widths.append(part[:, k, 1])
+    feed_L = np.full(len(x), float(design.get("Feed_Length", 2)))
+    feed_W = np.full(len(x), float(design["w50"]))
+    lengths = np.column_stack([feed_L] + lengths + [feed_L])
+    widths = np.column_stack([feed_W] + widths + [feed_W])
+    return widths, lengths
+
+
+def _sparams(x, design, freq):
+    widths, lengths = _sections(x, design)
+    return mlin_cascade_sparams(
+        widths, lengths, design["Er"], design["H_mm"], freq,
+        T_mm=design.get("T_mm", 0.0), tanD=design.get("tanD", 0.0),
+    )
+
+
+# Residuals of a batch of designs: the shortfall of every frequency point of
+# every check below target_margin (dB), zero where the point is met with
+# target_margin to spare. Shape (batch, n_checks * n_freq).
+def _residuals(x, design, mask, freq, target_margin):
+    S11, S21 = _sparams(x, design, freq)
+    checks = [m for m in point_margins(mask, freq, S21, S11) if m is not None]
+    r = np.concatenate([np.maximum(target_margin - np.broadcast_to(m, S21.shape), 0) for m in checks], axis=-1)
+    return r, S11, S21
+
+
+# Tune the lengths and per-section widths of a synthesized stepped-impedance
+# LPF so that it meets mask with target_margin dB to spare, using the
+# in-process MLIN cascade model. This is a Levenberg-Marquardt least-squares
+# fit of the per-point mask violations: each iteration evaluates the
+# forward-difference Jacobian (one perturbed design per parameter) and a set
+# of trial steps for several damping factors as single batched model calls.
+# Widths are kept >= min_width_mm and lengths >= min_length_mm.
+def optimize_stepped_impedance(
+    design, mask, freq, target_margin=0.1, max_iter=50, rel_step=1e-4,
+    min_width_mm=0.05, min_length_mm=0.1,
+):
+    freq = np.asarray(freq, dtype=float)
+    x = _initial_x(design)
+    n = len(x)
+    lower = np.tile([min_length_mm, min_width_mm], n // 2)
+    dampings = np.array([1e-3, 1e-2, 1e-1, 1, 10, 100])
+    lam = 1.0
+
+    r, S11, S21 = _residuals(x[None], design, mask, freq, target_margin)
+    r = r[0]
+    margin0 = float(evaluate_mask(mask, freq, S21, S11).margin[0])
+    cost = 0.5 * r @ r
+    n_evals = 1
+    n_iter = 0
+    for n_iter in range(1, max_iter + 1):
+        if cost == 0:
+            break
+        h = rel_step * np.maximum(np.abs(x), 1.0)
+        X = x + np.diag(h)
+        R = _residuals(X, design, mask, freq, target_margin)[0]
+        J = ((R - r) / h[:, None]).T
+        n_evals += n
+
+        JTJ = J.T @ J
+        g = J.T @ r
+        scale = np.diag(JTJ) + 1e-12
+        steps = np.array([
+            np.linalg.solve(JTJ + lam * d * np.diag(scale), -g) for d in dampings
+        ])
+        trials = np.maximum(x + steps, lower)
+        R = _residuals(trials, design, mask, freq, target_margin)[0]
+        n_evals += len(trials)
+        costs = 0.5 * np.einsum("ij,ij->i", R, R)
+
+        best = np.argmin(costs)
+        if costs[best] >= cost * (1 - 1e-9):
+            lam *= 100
+            if lam > 1e8:
+                break
+            continue
+        x, r, cost = trials[best], R[best], costs[best]
+        lam = max(lam * dampings[best] / 10, 1e-6)
+
+    S11, S21 = _sparams(x[None], design, freq)
+    margin = float(evaluate_mask(mask, freq, S21, S11).margin[0])
+    values = dict(zip(var_names(len(design["Line_L"]), len(design["Line_C"])), x.tolist()))
+    return OptimizeResult(values, margin, margin0, float(cost), n_iter, n_evals)
+
+
+# Write tuned values into the VAR instances of 5_microstrip_: Line_L*/w_ind*
+# live in v1, Line_C*/w_cap* in v2. Values are rounded to digits decimals (mm)
+def write_vars(values, v1, v2, digits=3):
+    for name, value in values.items():
+        var = v1 if name.startswith(("Line_L", "w_ind")) else v2
+        var.vars[name] = str(round(value, digits))
+
+
+# Design dict of a synthesized stepped-impedance LPF as 5_microstrip_ builds
+# it: Chebyshev prototype of order N, line lengths for Zhigh/Zlow sections
+# and widths from the Hammerstad-Jensen model, rounded to 0.01 mm
+def stepped_impedance_design(ripple_db, fc, fs, R0, N, Er, H_mm, T_mm, tanD, Zhigh, Zlow, Feed_Length=2):
+    from lpf_synthesis import lpf_design_by_N
+    from microstrip_calc import microstrip_W_fromZ0
+
+    gk = lpf_design_by_N(ripple_db, fc, fs, R0, N)[4]
+    beta = 2 * np.pi / (3e11 / (fc * np.sqrt(Er)))
+    w_ind, w_cap, w50 = np.round(microstrip_W_fromZ0(Er, H_mm, [Zhigh, Zlow, R0], T_mm), 2)
+    return {
+        "Line_L": [round(R0 * g / Zhigh / beta, 2) for g in gk[0::2]],
+        "Line_C": [round(g * Zlow / R0 / beta, 2) for g in gk[1::2]],
+        "w_ind": w_ind, "w_cap": w_cap, "w50": w50,
+        "Er": Er, "H_mm": H_mm, "T_mm": T_mm, "tanD": tanD, "Feed_Length": Feed_Length,
+    }
+
+
+# Benchmark on the 5_microstrip_lpf_synthesis.py design: python filter_optimizer.py
+if __name__ == "__main__":
+    from spec_mask import SpecMask
+
+    fc, fs = 2000e6, 3500e6
+    design = stepped_impedance_design(0.1, fc, fs, 50, 7, 3.66, 0.508, 0.017, 0.0023, 130, 15)
+    mask = SpecMask(fc=fc, ripple_db=0.5, fs=fs, La=30, S11_max_db=-15)
+    freq = np.linspace(0.05e9, 1.5 * fs, 300)
+
+    t0 = time.perf_counter()
+    result = optimize_stepped_impedance(design, mask, freq)
+    print(
+        f"{result.n_iter} iterations, {result.n_evals} model evaluations in "
+        f"{time.perf_counter() - t0:.2f} s: margin {result.margin0:+.2f} -> {result.margin:+.2f} dB"
+    )
+    for name, value in result.values.items():
+        print(f"  {name:8s} {value:.3f} mm")
@@ -0,0 +1,154 @@
+import re
+import time
+
+import numpy as np
+
+
+def _traces(model, freq):
+    S = np.asarray(model(freq), dtype=complex)
+    return S.reshape(-1, len(freq))
+
+
+# Frequency points from start to stop (Hz) placed where the response needs
+# them. model(freq) returns complex S-parameters with frequency on the last
+# axis (several traces allowed), e.g. lambda f: np.stack(lc_ladder_sparams(L, C, f))
+# with the synthesized values. Starting from n_initial uniform points, every
+# interval whose midpoint differs from linear interpolation of its ends by more
+# than tol (complex |S| error, 1e-3 is -60 dB) is bisected, one batched model
+# call per pass, so points gather at ripple peaks, reflection zeros and band
+# edges and flat regions stay coarse. Spacings are all dyadic fractions of the
+# initial step, which keeps the result compact as frequency_segments().
+def adaptive_frequencies(model, start, stop, tol=1e-3, n_initial=33, max_points=5000):
+    freq = np.linspace(start, stop, n_initial)
+    S = _traces(model, freq)
+    active = np.ones(len(freq) - 1, dtype=bool)
+
+    while active.any():
+        idx = np.flatnonzero(active)
+        mid = (freq[idx] + freq[idx + 1]) / 2
+        Sm = _traces(model, mid)
+        err = np.abs(Sm - (S[:, idx] + S[:, idx + 1]) / 2).max(axis=0)
+        bad = err > tol
+        if len(freq) + bad.sum() > max_points:
+            # keep the worst intervals within the point budget
+            bad[np.argsort(-err)[max(max_points - len(freq), 0):]] = False
+        if not bad.any():
+            break
+
+        at = idx[bad] + 1
+        freq = np.insert(freq, at, mid[bad])
+        S = np.insert(S, at, Sm[:, bad], axis=1)
+        # both halves of a split interval are checked again
+        active = np.zeros(len(freq) - 1, dtype=bool)
+        new = at + np.arange(len(at))
+        active[new - 1] = True
+        active[new] = True
+    return freq
+
+
+# Group a sorted frequency list into at most max_segments linear segments
+# (start, stop, step) for a segmented S_Param sweep. Runs of equal spacing
+# become segments; while there are too many, the neighbouring pair that adds
+# the fewest points when merged at the finer step is merged. Every point of
+# freq is covered by a segment at the same or a finer step.
+def frequency_segments(freq, max_segments=8, rtol=1e-6):
+    freq = np.asarray(freq, dtype=float)
+    steps = np.diff(freq)
+    segments = []
+    for i, step in enumerate(steps):
+        if segments and np.isclose(step, segments[-1][2], rtol=rtol, atol=0):
+            segments[-1][1] = freq[i + 1]
+        else:
+            segments.append([freq[i], freq[i + 1], step])
+
+    def count(seg):
+        return int(round((seg[1] - seg[0]) / seg[2]))
+
+    while len(segments) > max_segments:
+        costs = []
+        for a, b in zip(segments, segments[1:]):
+            step = min(a[2], b[2])
+            costs.append(count([a[0], b[1], step]) - count(a) - count(b))
+        i = int(np.argmin(costs))
+        a, b = segments[i], segments[i + 1]
+        segments[i:i + 2] = [[a[0], b[1], min(a[2], b[2])]]
+    return [tuple(seg) for seg in segments]
+
+
+# Points simulated by a list of segments, shared segment ends counted once
+def segment_points(segments):
+    freq = np.concatenate([
+        start + step * np.arange(int(round((stop - start) / step)) + 1)
+        for start, stop, step in segments
+    ])
+    return np.unique(np.round(freq, 3))
+
+
+def _hz(value):
+    return f"{float(value):.12g} Hz"
+
+
+# SweepPlan statements for segments [(start, stop, step), ...] or an explicit
+# point list, chained through SweepPlan= as ADS netlists the SweepPlan component
+def sweep_plan_netlist(plan_name, segments=None, points=None):
+    if points is not None:
+        return f"SweepPlan:{plan_name} " + " ".join(f"Pt={_hz(f)}" for f in points) + "\n"
+    lines = []
+    for i, (start, stop, step) in enumerate(segments):
+        name = plan_name if i == 0 else f"{plan_name}_{i + 1}"
+        line = f"SweepPlan:{name} Start={_hz(start)} Stop={_hz(stop)} Step={_hz(step)}"
+        if i + 1 < len(segments):
+            line += f' UseSweepPlan=yes SweepPlan="{plan_name}_{i + 2}"'
+        lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+# Replace the Start/Stop/Step of the S_Param analysis sim_name in netlist text
+# by a SweepPlan over segments or an explicit point list (Hz). The SweepPlan
+# statements have not yet been run on the simulator, so no tutorial script
+# uses this until they have.
+def set_netlist_sweep_plan(netlist, sim_name, segments=None, points=None, plan_name="AdaptiveFreq"):
+    statement = re.compile(rf"^S_Param:{re.escape(sim_name)}\b(?:[^\n]*\\\n)*[^\n]*", re.MULTILINE)
+    match = statement.search(netlist)
+    if match is None:
+        raise KeyError(f"S_Param {sim_name!r} not found in the netlist")
+    text = match.group(0)
+    for key in ("Start", "Stop", "Step", "SweepPlan"):
+        text = re.sub(rf"[ \t]+{key}=[^\s\\]+(?:[ \t]+[A-Za-z]+(?![\w\[\]]*=))?", "", text)
+    text += f' SweepPlan="{plan_name}"'
+    plan = sweep_plan_netlist(plan_name, segments, points)
+    return netlist[:match.start()] + plan + text + netlist[match.end():]
+
+
+# Benchmark on the 5-pole 70 nH / 30 pF ladder of 3_, simulated there from
+# 0.01 to 0.5 GHz in 1 MHz steps: python freq_planner.py
+if __name__ == "__main__":
+    from abcd_cascade import lc_ladder_sparams
+
+    def model(f):
+        return np.stack(lc_ladder_sparams([70] * 5, [30] * 4, f))
+
+    def interp_error(freq):
+        dense = np.linspace(freq[0], freq[-1], 200001)
+        ref = model(dense)
+        S = model(freq)
+        est = np.array([np.interp(dense, freq, s.real) + 1j * np.interp(dense, freq, s.imag) for s in S])
+        return np.abs(est - ref).max()
+
+    uniform = np.arange(0.01e9, 0.5e9 + 0.5e6, 1e6)
+    target = interp_error(uniform)
+    print(f"uniform 1 MHz grid: {len(uniform)} points, max interpolation error {target:.2e}")
+
+    t0 = time.perf_counter()
+    freq = adaptive_frequencies(model, 0.01e9, 0.5e9, tol=target / 2)
+    elapsed = time.perf_counter() - t0
+    segments = frequency_segments(freq)
+    seg_freq = segment_points(segments)
+    print(
+        f"adaptive ({elapsed * 1e3:.1f} ms): {len(freq)} points, error {interp_error(freq):.2e}, "
+        f"{len(uniform) / len(freq):.1f}x fewer"
+    )
+    print(
+        f"{len(segments)} segments: {len(seg_freq)} points, error {interp_error(seg_freq):.2e}, "
+        f"{len(uniform) / len(seg_freq):.1f}x fewer"
+    )
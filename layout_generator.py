@@ -0,0 +1,239 @@
+import math
+import time
+from collections import namedtuple
+
+# Conductor rectangle of one line section in mm, lower-left and upper-right
+# corners
+LayoutRect = namedtuple("LayoutRect", ["name", "x0", "y0", "x1", "y1"])
+
+# Port reference plane: centre point (mm), width of the line it feeds and the
+# direction it faces in degrees (180 = towards -x)
+LayoutPort = namedtuple("LayoutPort", ["name", "point", "width", "angle"])
+
+# Physical layout of a filter: rects in order along the signal path, ports
+FilterGeometry = namedtuple("FilterGeometry", ["rects", "ports"])
+
+
+# Physical layout of the stepped-impedance LPF of 5_microstrip_: 50 Ohm feed
+# lines, alternating high (Line_L/w_ind) and low (Line_C/w_cap) impedance
+# sections and one port at either end, laid out along +x from origin and
+# centred on its y. values may override per-section lengths and widths by the
+# VAR names (Line_L1, w_ind1, ...), e.g. with optimize_stepped_impedance()
+# results. All sizes in mm.
+def stepped_impedance_geometry(Line_L, Line_C, w_ind, w_cap, w50, Feed_Length, values=None, origin=(0, 0)):
+    values = values or {}
+    sections = [("IP_50", Feed_Length, w50)]
+    for k in range(max(len(Line_L), len(Line_C))):
+        for kind, lengths, width in (("L", Line_L, w_ind), ("C", Line_C, w_cap)):
+            if k < len(lengths):
+                sections.append((
+                    f"TL_{kind}{k + 1}",
+                    values.get(f"Line_{kind}{k + 1}", lengths[k]),
+                    values.get(f"{'w_ind' if kind == 'L' else 'w_cap'}{k + 1}", width),
+                ))
+    sections.append(("OP_50", Feed_Length, w50))
+
+    x, yc = origin
+    rects = []
+    for name, length, width in sections:
+        length, width = float(length), float(width)
+        if length <= 0 or width <= 0:
+            raise ValueError(f"{name}: length and width must be positive, got {length} x {width} mm")
+        rects.append(LayoutRect(name, x, yc - width / 2, x + length, yc + width / 2))
+        x += length
+    ports = [
+        LayoutPort("P1", (rects[0].x0, yc), float(w50), 180),
+        LayoutPort("P2", (rects[-1].x1, yc), float(w50), 0),
+    ]
+    return FilterGeometry(rects, ports)
+
+
+def bbox(rects):
+    return (
+        min(r.x0 for r in rects), min(r.y0 for r in rects),
+        max(r.x1 for r in rects), max(r.y1 for r in rects),
+    )
+
+
+# Merge rects that abut end to end along x (a stepped line) into one
+# rectilinear outline polygon, counter-clockwise from the lower-left corner
+# of the first rect. Raises ValueError for gaps, overlaps or sections that do
+# not touch, which would leave the line open or shorted.
+def chain_outline(rects, tol=1e-9):
+    for a, b in zip(rects, rects[1:]):
+        if abs(a.x1 - b.x0) > tol:
+            raise ValueError(f"{a.name} ends at x={a.x1} but {b.name} starts at x={b.x0}")
+        if min(a.y1, b.y1) - max(a.y0, b.y0) <= tol:
+            raise ValueError(f"{a.name} and {b.name} do not overlap in y")
+
+    points = []
+    for r in rects:
+        points += [(r.x0, r.y0), (r.x1, r.y0)]
+    for r in reversed(rects):
+        points += [(r.x1, r.y1), (r.x0, r.y1)]
+
+    outline = []
+    for p in points:
+        if outline and abs(p[0] - outline[-1][0]) <= tol and abs(p[1] - outline[-1][1]) <= tol:
+            continue
+        # drop the middle point of collinear runs
+        if len(outline) >= 2:
+            (ax, ay), (bx, by) = outline[-2], outline[-1]
+            if abs((bx - ax) * (p[1] - ay) - (by - ay) * (p[0] - ax)) <= tol:
+                outline.pop()
+        outline.append(p)
+    if len(outline) > 1 and outline[-1] == outline[0]:
+        outline.pop()
+    return outline
+
+
+# Port writer for build_layout(add_port=...): marks each port on pin_layer
+# with a pin rectangle of the line width reaching depth (default: the width)
+# into the line from the reference plane, labelled with the port name at the
+# reference point, for the EM port setup to pick up. label(layout, layer,
+# text, point) defaults to TextMaker.add_text.
+def port_marker(pin_layer, depth=None, label=None):
+    if label is None:
+        from keysight.ads.de.experimental.text_maker import TextMaker
+
+        def label(layout, layer, text, point):
+            TextMaker(layout).add_text(layer, text, point)
+
+    def add_port(layout, port):
+        x, y = port.point
+        d = port.width if depth is None else depth
+        # into the line is opposite to the direction the port faces
+        ux = -round(math.cos(math.radians(port.angle)))
+        uy = -round(math.sin(math.radians(port.angle)))
+        if ux:
+            x0, y0, x1, y1 = x, y - port.width / 2, x + ux * d, y + port.width / 2
+        else:
+            x0, y0, x1, y1 = x - port.width / 2, y, x + port.width / 2, y + uy * d
+        layout.add_rectangle(pin_layer, (min(x0, x1), min(y0, y1)), (max(x0, x1), max(y0, y1)))
+        label(layout, pin_layer, port.name, port.point)
+
+    return add_port
+
+
+# Create geometry on layout (a db_uu layout design) on layer inside one
+# Transaction: either one add_rectangle (or add_path with flat ends, as_paths)
+# per section, or the merged outline as a single add_polygon (merge). Ports
+# are created by add_port(layout, port) when given, e.g. port_marker();
+# otherwise they are only returned in the geometry. transaction defaults to
+# db_uu.Transaction; schematic_builder.RecordingTransaction together with
+# RecordingLayout runs without ADS. Returns seconds per phase.
+def build_layout(layout, geometry, layer, transaction=None, merge=False, as_paths=False, add_port=None, save=True):
+    if transaction is None:
+        from keysight.ads.de.db_uu import Transaction as transaction
+
+    timings = {}
+    t0 = time.perf_counter()
+    with transaction(layout) as t:
+        if merge:
+            layout.add_polygon(layer, chain_outline(geometry.rects))
+        elif as_paths:
+            for r in geometry.rects:
+                yc = (r.y0 + r.y1) / 2
+                layout.add_path(layer, [(r.x0, yc), (r.x1, yc)], r.y1 - r.y0)
+        else:
+            for r in geometry.rects:
+                layout.add_rectangle(layer, (r.x0, r.y0), (r.x1, r.y1))
+        if add_port is not None:
+            for port in geometry.ports:
+                add_port(layout, port)
+        t1 = time.perf_counter()
+        timings["shapes"] = t1 - t0
+        t.commit()
+    t2 = time.perf_counter()
+    timings["commit"] = t2 - t1
+
+    if save:
+        layout.save_design()
+    timings["save"] = time.perf_counter() - t2
+    return timings
+
+
+# Layout views for many variants, e.g. the Monte-Carlo or sweep designs sent
+# to EM: variants maps cell name -> FilterGeometry. create(lib, cell) opens a
+# new layout design and defaults to db_uu.create_layout.
+def generate_layouts(lib, variants, layer, create=None, **kwargs):
+    if create is None:
+        from keysight.ads.de import db_uu
+
+        def create(lib, cell):
+            return db_uu.create_layout(f"{lib}:{cell}:layout")
+
+    designs = {}
+    for cell, geometry in variants.items():
+        designs[cell] = layout = create(lib, cell)
+        build_layout(layout, geometry, layer, **kwargs)
+    return designs
+
+
+# Stand-in for a db_uu layout design that records the shapes it is given, to
+# pair with schematic_builder.RecordingTransaction
+class RecordingLayout:
+    def __init__(self):
+        self.calls = []
+        self.shapes = []
+        self.in_transaction = False
+
+    def _add(self, kind, *args):
+        self.shapes.append((kind,) + args)
+        self.calls.append(("add_" + kind,) + args)
+
+    def add_rectangle(self, layer, p0, p1):
+        self._add("rectangle", layer, tuple(p0), tuple(p1))
+
+    def add_polygon(self, layer, points):
+        self._add("polygon", layer, [tuple(p) for p in points])
+
+    def add_path(self, layer, points, width):
+        self._add("path", layer, [tuple(p) for p in points], width)
+
+    def add_trace(self, layer, points, width):
+        self._add("trace", layer, [tuple(p) for p in points], width)
+
+    def add_circle(self, layer, center, radius):
+        self._add("circle", layer, tuple(center), radius)
+
+    def add_text(self, layer, text, point):
+        self._add("text", layer, text, tuple(point))
+
+    def save_design(self):
+        self.calls.append(("save_design",))
+
+
+# Benchmark: layouts of n_variants random perturbations of the 5_microstrip_
+# design, python layout_generator.py [n_variants]
+if __name__ == "__main__":
+    import random
+    import sys
+
+    from schematic_builder import RecordingTransaction
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    Line_L = [5.67, 10.06, 10.06, 5.67]
+    Line_C = [5.33, 5.89, 5.33]
+    rng = random.Random(0)
+
+    t0 = time.perf_counter()
+    variants = {}
+    for i in range(n):
+        values = {f"Line_L{k + 1}": v * rng.uniform(0.95, 1.05) for k, v in enumerate(Line_L)}
+        values.update({f"w_cap{k + 1}": 5.5 * rng.uniform(0.95, 1.05) for k in range(len(Line_C))})
+        variants[f"lpf_{i}"] = stepped_impedance_geometry(Line_L, Line_C, 0.11, 5.5, 1.09, 2, values)
+    t1 = time.perf_counter()
+    designs = generate_layouts(
+        "bench", variants, "cond", create=lambda lib, cell: RecordingLayout(),
+        transaction=RecordingTransaction, merge=True,
+        add_port=port_marker("pin", label=lambda layout, layer, text, point: layout.add_text(layer, text, point)),
+    )
+    t2 = time.perf_counter()
+
+    sizes = [bbox(g.rects) for g in variants.values()]
+    print(f"{n} variants: geometry {(t1 - t0) * 1e3:.1f} ms, merged layouts {(t2 - t1) * 1e3:.1f} ms")
+    print(f"outline of lpf_0: {len(designs['lpf_0'].shapes[0][2])} vertices")
+    pins = [shape for shape in designs["lpf_0"].shapes if shape[0] == "text"]
+    print(f"ports of lpf_0: {', '.join(f'{name} at {point}' for _, _, name, point in pins)}")
+    print(f"largest footprint {max(x1 - x0 for x0, _, x1, _ in sizes):.2f} x {max(y1 - y0 for _, y0, _, y1 in sizes):.2f} mm")
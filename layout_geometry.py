@@ -0,0 +1,507 @@
+import time
+from collections import namedtuple
+
+import numpy as np
+
+# Polygons packed into one (V, 2) vertex array: polygon i is
+# vertices[offsets[i]:offsets[i + 1]], implicitly closed, in layout units (mm
+# for the std_ads millimeter technology of 8_). Open paths use the same
+# packing for their centre lines.
+PolygonSet = namedtuple("PolygonSet", ["vertices", "offsets"])
+
+# check_layout() results: ids of polygons narrower than min_width, (i, j)
+# pairs closer than min_spacing without touching, and (i, j) pairs whose
+# interiors overlap
+DRCResult = namedtuple("DRCResult", ["width", "spacing", "overlaps"])
+
+_OPS = {
+    "or": lambda a, b: a | b,
+    "and": lambda a, b: a & b,
+    "not": lambda a, b: a & ~b,
+    "xor": lambda a, b: a ^ b,
+}
+
+
+def polygon_set(polygons):
+    polygons = [np.asarray(p, dtype=float).reshape(-1, 2) for p in polygons]
+    counts = [len(p) for p in polygons]
+    vertices = np.concatenate(polygons) if polygons else np.zeros((0, 2))
+    return PolygonSet(vertices, np.concatenate([[0], np.cumsum(counts, dtype=np.int64)]))
+
+
+def concat(*sets):
+    offsets, base = [np.zeros(1, dtype=np.int64)], 0
+    for s in sets:
+        offsets.append(s.offsets[1:] + base)
+        base += len(s.vertices)
+    return PolygonSet(np.concatenate([s.vertices for s in sets]), np.concatenate(offsets))
+
+
+def count(ps):
+    return len(ps.offsets) - 1
+
+
+# Point lists as taken by layout.add_polygon()
+def polygon_list(ps):
+    return [ps.vertices[a:b].tolist() for a, b in zip(ps.offsets[:-1], ps.offsets[1:])]
+
+
+def _owner(offsets):
+    return np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+
+
+# Index ranges start[i] + (0 .. sizes[i] - 1) flattened, with the range each
+# entry belongs to
+def _ranges(start, sizes):
+    owner = np.repeat(np.arange(len(sizes)), sizes)
+    first = np.cumsum(sizes) - sizes
+    return owner, start[owner] + np.arange(owner.size) - first[owner]
+
+
+def rectangles(p0, p1):
+    p0, p1 = np.atleast_2d(np.asarray(p0, dtype=float)), np.atleast_2d(np.asarray(p1, dtype=float))
+    lo, hi = np.minimum(p0, p1), np.maximum(p0, p1)
+    vertices = np.stack(
+        [lo, np.column_stack([hi[:, 0], lo[:, 1]]), hi, np.column_stack([lo[:, 0], hi[:, 1]])], axis=1
+    ).reshape(-1, 2)
+    return PolygonSet(vertices, np.arange(0, len(vertices) + 1, 4, dtype=np.int64))
+
+
+# Outline polygons of paths (centre lines as point lists or a PolygonSet) of
+# the given widths, with flat ends at the first and last point and mitred
+# corners as drawn by layout.add_path(). Paths that turn back on themselves
+# have no mitre and raise ValueError.
+def path_polygons(paths, widths):
+    if not isinstance(paths, PolygonSet):
+        paths = polygon_set(paths)
+    p, off = paths.vertices, paths.offsets
+    counts = np.diff(off)
+    if (counts < 2).any():
+        raise ValueError("A path needs at least two points")
+    owner = _owner(off)
+    half = np.broadcast_to(np.asarray(widths, dtype=float), counts.shape)[owner] / 2
+    first, last = off[:-1], off[1:] - 1
+
+    # unit direction of the segment leaving each vertex
+    seg = np.zeros_like(p)
+    seg[:-1] = p[1:] - p[:-1]
+    seg[last] = 0
+    length = np.hypot(seg[:, 0], seg[:, 1])
+    length[last] = 1
+    if (length == 0).any():
+        raise ValueError("Paths must not repeat points")
+    u_out = seg / length[:, None]
+    u_out[last] = u_out[last - 1]
+    u_in = np.empty_like(p)
+    u_in[1:] = u_out[:-1]
+    u_in[first] = u_out[first]
+
+    n_in = np.column_stack([-u_in[:, 1], u_in[:, 0]])
+    n_out = np.column_stack([-u_out[:, 1], u_out[:, 0]])
+    denom = 1 + np.sum(n_in * n_out, axis=1)
+    if (denom < 1e-9).any():
+        raise ValueError("Paths must not turn back on themselves")
+    miter = (n_in + n_out) / denom[:, None] * half[:, None]
+    left, right = p + miter, p - miter
+
+    # counter-clockwise: along the right side, back along the left side
+    out_owner, t = _ranges(np.zeros(len(counts), dtype=np.int64), 2 * counts)
+    m, s = counts[out_owner], off[out_owner]
+    vertices = np.where(
+        (t < m)[:, None], right[np.minimum(s + t, len(p) - 1)], left[np.clip(s + 2 * m - 1 - t, 0, len(p) - 1)]
+    )
+    return PolygonSet(vertices, 2 * off)
+
+
+# Circles as regular polygons with vertices on the circle, enough of them
+# (a multiple of 4, at least 8) that no edge is further than tol from the arc
+def circles(centers, radii, tol=1e-3, max_segments=256):
+    centers = np.atleast_2d(np.asarray(centers, dtype=float))
+    radii = np.broadcast_to(np.asarray(radii, dtype=float), (len(centers),))
+    n = np.ceil(np.pi / np.arccos(np.clip(1 - tol / radii, -1, 1)))
+    n = np.clip(4 * np.ceil(n / 4), 8, max_segments).astype(np.int64)
+    owner, k = _ranges(np.zeros(len(n), dtype=np.int64), n)
+    angle = 2 * np.pi * k / n[owner]
+    vertices = centers[owner] + radii[owner, None] * np.column_stack([np.cos(angle), np.sin(angle)])
+    return PolygonSet(vertices, np.concatenate([[0], np.cumsum(n)]))
+
+
+# (x0, y0, x1, y1) per polygon
+def bboxes(ps):
+    if count(ps) == 0:
+        return np.zeros((0, 4))
+    v, s = ps.vertices, ps.offsets[:-1]
+    return np.column_stack([
+        np.minimum.reduceat(v[:, 0], s), np.minimum.reduceat(v[:, 1], s),
+        np.maximum.reduceat(v[:, 0], s), np.maximum.reduceat(v[:, 1], s),
+    ])
+
+
+# Start and end point of every edge, with the polygon it belongs to
+def _edges(ps):
+    v, off = ps.vertices, ps.offsets
+    nxt = np.arange(1, len(v) + 1)
+    nxt[off[1:] - 1] = off[:-1]
+    return v, v[nxt], _owner(off)
+
+
+# Signed areas, positive for counter-clockwise polygons
+def areas(ps):
+    if count(ps) == 0:
+        return np.zeros(0)
+    a, b, _ = _edges(ps)
+    return 0.5 * np.add.reduceat(a[:, 0] * b[:, 1] - b[:, 0] * a[:, 1], ps.offsets[:-1])
+
+
+# Uniform grid spatial index over bounding boxes. Every box is registered in
+# the cells it covers, widened by margin / 2 on each side, so boxes less than
+# margin apart share a cell. cell defaults to the median box size, which keeps
+# a few entries per box for layouts of similar shapes.
+class GridIndex:
+    def __init__(self, boxes, cell=None, margin=0.0):
+        self.boxes = np.asarray(boxes, dtype=float).reshape(-1, 4)
+        self.margin = margin
+        if cell is None:
+            sizes = np.maximum(self.boxes[:, 2] - self.boxes[:, 0], self.boxes[:, 3] - self.boxes[:, 1])
+            cell = float(np.median(sizes)) + margin if len(sizes) else 1.0
+        self.cell = cell if cell > 0 else 1.0
+
+        ix0, iy0, ix1, iy1 = self._cells(self.boxes)
+        nx, ny = ix1 - ix0 + 1, iy1 - iy0 + 1
+        ids, k = _ranges(np.zeros(len(nx), dtype=np.int64), nx * ny)
+        keys = self._key(ix0[ids] + k % nx[ids], iy0[ids] + k // nx[ids])
+        order = np.argsort(keys, kind="stable")
+        self._keys, self._ids = keys[order], ids[order]
+
+    def _cells(self, boxes):
+        m = self.margin / 2
+        lo = np.floor((boxes[:, :2] - m) / self.cell).astype(np.int64)
+        hi = np.floor((boxes[:, 2:] + m) / self.cell).astype(np.int64)
+        return lo[:, 0], lo[:, 1], hi[:, 0], hi[:, 1]
+
+    @staticmethod
+    def _key(ix, iy):
+        return ((ix + 2**31) << 32) | (iy + 2**31)
+
+    def _overlap(self, i, box):
+        m = self.margin
+        b = self.boxes[i]
+        return (b[..., 0] <= box[..., 2] + m) & (box[..., 0] <= b[..., 2] + m) & \
+               (b[..., 1] <= box[..., 3] + m) & (box[..., 1] <= b[..., 3] + m)
+
+    # Ids of boxes within margin of box
+    def query(self, box):
+        box = np.asarray(box, dtype=float)
+        ix0, iy0, ix1, iy1 = (int(c[0]) for c in self._cells(box[None]))
+        found = []
+        for ix in range(ix0, ix1 + 1):
+            for iy in range(iy0, iy1 + 1):
+                key = self._key(ix, iy)
+                found.append(self._ids[np.searchsorted(self._keys, key):np.searchsorted(self._keys, key, "right")])
+        ids = np.unique(np.concatenate(found)) if found else np.zeros(0, dtype=np.int64)
+        return ids[self._overlap(ids, box)]
+
+    # All (i, j), i < j, of boxes within margin of each other, as a (P, 2) array
+    def pairs(self):
+        keys, ids = self._keys, self._ids
+        bounds = np.concatenate([[0], np.flatnonzero(keys[1:] != keys[:-1]) + 1, [len(keys)]])
+        size = np.diff(bounds)
+        # every entry pairs with the entries after it in its cell
+        group = np.repeat(np.arange(len(size)), size)
+        after = bounds[1:][group] - np.arange(len(keys)) - 1
+        a, b = _ranges(np.arange(len(keys)) + 1, after)
+        i, j = ids[a], ids[b]
+        i, j = np.minimum(i, j), np.maximum(i, j)
+        code = np.unique(i * len(self.boxes) + j)
+        i, j = code // max(len(self.boxes), 1), code % max(len(self.boxes), 1)
+        keep = self._overlap(i, self.boxes[j])
+        return np.column_stack([i[keep], j[keep]])
+
+
+# Connected groups of polygons whose boxes are within margin of each other,
+# as a label per polygon
+def clusters(ps, margin=0.0):
+    n = count(ps)
+    pairs = GridIndex(bboxes(ps), margin=margin).pairs()
+    labels = np.arange(n)
+    while True:
+        m = np.minimum(labels[pairs[:, 0]], labels[pairs[:, 1]])
+        new = labels.copy()
+        np.minimum.at(new, pairs[:, 0], m)
+        np.minimum.at(new, pairs[:, 1], m)
+        new = new[new]
+        if np.array_equal(new, labels):
+            return np.unique(labels, return_inverse=True)[1]
+        labels = new
+
+
+# Trapezoid sweep over non-horizontal edges (x0, y0) -> (x1, y1) with y0 < y1,
+# their winding (+1 for edges running up in the source polygon), operand
+# (0 for a, 1 for b) and group. Groups are swept independently, each over
+# slabs between the y values of its vertices and edge crossings, so
+# unrelated clusters of a layout never share slabs. Within a slab edges do
+# not cross; the nonzero winding of each operand to the right of every edge
+# decides whether the span up to the next edge is inside op(a, b). Returns
+# the trapezoids and the group of each.
+def _sweep(x0, y0, x1, y1, wind, operand, group, op, eps):
+    empty = PolygonSet(np.zeros((0, 2)), np.zeros(1, dtype=np.int64)), np.zeros(0, dtype=np.int64)
+    if not len(x0):
+        return empty
+    # complex numbers sort by real then imaginary part: (group, y) events
+    events = np.unique(np.concatenate([group + 1j * y0, group + 1j * y1]))
+    slope = (x1 - x0) / (y1 - y0)
+    while True:
+        lo = np.searchsorted(events, group + 1j * y0)
+        hi = np.searchsorted(events, group + 1j * y1)
+        eid, slab = _ranges(lo, hi - lo)
+        ylo, yhi = events[slab].imag, events[slab + 1].imag
+        xlo = x0[eid] + (ylo - y0[eid]) * slope[eid]
+        xhi = x0[eid] + (yhi - y0[eid]) * slope[eid]
+        order = np.lexsort(((xlo + xhi) / 2, slab))
+        eid, slab, ylo, yhi, xlo, xhi = eid[order], slab[order], ylo[order], yhi[order], xlo[order], xhi[order]
+
+        # neighbours in the same slab that swap order cross inside it
+        same = slab[1:] == slab[:-1]
+        a, b = xlo[:-1] - xlo[1:], xhi[:-1] - xhi[1:]
+        k = np.flatnonzero(same & ((a > eps) | (b > eps)) & (a * b < 0))
+        if not len(k):
+            break
+        t = a[k] / (a[k] - b[k])
+        inner = (t > 1e-12) & (t < 1 - 1e-12)
+        k, t = k[inner], t[inner]
+        y = ylo[k] + t * (yhi[k] - ylo[k])
+        n_events = len(events)
+        events = np.unique(np.concatenate([events, events[slab[k]].real + 1j * y]))
+        if len(events) == n_events:
+            break
+
+    w = wind[eid]
+    wa = np.where(operand[eid] == 0, w, 0).cumsum()
+    wb = np.where(operand[eid] == 1, w, 0).cumsum()
+    start = np.concatenate([[True], slab[1:] != slab[:-1]])
+    first = np.flatnonzero(start)
+    run = np.cumsum(start) - 1
+    base_a = (wa - np.where(operand[eid] == 0, w, 0))[first][run]
+    base_b = (wb - np.where(operand[eid] == 1, w, 0))[first][run]
+    inside = _OPS[op]((wa - base_a) != 0, (wb - base_b) != 0)
+    prev = np.concatenate([[False], inside[:-1]]) & ~start
+    left, right = np.flatnonzero(inside & ~prev), np.flatnonzero(~inside & prev)
+    keep = (xlo[right] - xlo[left]) + (xhi[right] - xhi[left]) > eps
+    left, right = left[keep], right[keep]
+    if not len(left):
+        return empty
+
+    # stack trapezoids bounded by the same two edges in consecutive slabs
+    le, re, sl = eid[left], eid[right], slab[left]
+    order = np.lexsort((sl, re, le))
+    left, right, le, re, sl = left[order], right[order], le[order], re[order], sl[order]
+    new = np.concatenate([[True], (le[1:] != le[:-1]) | (re[1:] != re[:-1]) | (sl[1:] != sl[:-1] + 1)])
+    head = np.flatnonzero(new)
+    tail = np.concatenate([head[1:], [len(new)]]) - 1
+    bl, br, tl, tr = left[head], right[head], left[tail], right[tail]
+
+    corners = np.stack([
+        np.column_stack([xlo[bl], ylo[bl]]), np.column_stack([xlo[br], ylo[br]]),
+        np.column_stack([xhi[tr], yhi[tr]]), np.column_stack([xhi[tl], yhi[tl]]),
+    ], axis=1)
+    # triangles where a side has zero length
+    valid = np.ones(corners.shape[:2], dtype=bool)
+    valid[:, 1] = np.abs(corners[:, 1, 0] - corners[:, 0, 0]) > eps
+    valid[:, 2] = np.abs(corners[:, 2, 0] - corners[:, 3, 0]) > eps
+    trapezoids = PolygonSet(corners[valid], np.concatenate([[0], np.cumsum(valid.sum(axis=1))]))
+    return trapezoids, events[slab[bl]].real.astype(np.int64)
+
+
+def _sweep_edges(ps, operand, group):
+    a, b, owner = _edges(ps)
+    orient = np.sign(areas(ps))[owner]
+    up = b[:, 1] > a[:, 1]
+    keep = a[:, 1] != b[:, 1]
+    lo, hi = np.where(up[:, None], a, b)[keep], np.where(up[:, None], b, a)[keep]
+    wind = (np.where(up, 1, -1) * orient)[keep]
+    return lo[:, 0], lo[:, 1], hi[:, 0], hi[:, 1], wind, operand[owner][keep], group[owner][keep]
+
+
+def _eps(*sets):
+    scale = max((np.abs(s.vertices).max() for s in sets if len(s.vertices)), default=1.0)
+    return 1e-9 * max(scale, 1.0)
+
+
+# Boolean operation op ("or", "and", "not" = a minus b, "xor") between two
+# polygon sets, each taken as the union of its polygons whatever their
+# orientation. The result is a set of non-overlapping trapezoids (and
+# triangles), each a valid add_polygon() shape; polygons are processed in
+# clusters of touching bounding boxes, so the cost grows with the size of the
+# clusters rather than of the whole layout.
+def boolean(a, b, op="or"):
+    ps = concat(a, b)
+    if count(ps) == 0:
+        return ps
+    operand = np.repeat([0, 1], [count(a), count(b)])
+    edges = _sweep_edges(ps, operand, clusters(ps))
+    return _sweep(*edges, op, _eps(ps))[0]
+
+
+# Union of all polygons of a set, e.g. shapes on one layer before committing
+def merge(ps):
+    return boolean(ps, polygon_set([]), "or")
+
+
+# Per-pair edge combinations of polygons i[p] and j[p], in chunks of about
+# limit entries: yields (pairs in chunk, pair index, edge of i, edge of j)
+def _pair_edges(ps, i, j, limit=2_000_000):
+    off = ps.offsets
+    size = (off[i + 1] - off[i]) * (off[j + 1] - off[j])
+    cut = np.searchsorted(np.cumsum(size), np.arange(limit, size.sum() + limit, limit), "right")
+    bounds = np.unique(np.concatenate([[0], np.maximum(cut, 1), [len(i)]]))
+    for p0, p1 in zip(bounds[:-1], bounds[1:]):
+        ci, cj = i[p0:p1], j[p0:p1]
+        nb = off[cj + 1] - off[cj]
+        pid, k = _ranges(np.zeros(len(ci), dtype=np.int64), size[p0:p1])
+        yield slice(p0, p1), pid, off[ci][pid] + k // nb[pid], off[cj][pid] + k % nb[pid]
+
+
+def _point_segment(p, a, b):
+    d = b - a
+    t = np.clip(np.sum((p - a) * d, axis=1) / np.maximum(np.sum(d * d, axis=1), 1e-300), 0, 1)
+    return np.hypot(*(a + t[:, None] * d - p).T)
+
+
+def _cross(u, v):
+    return u[:, 0] * v[:, 1] - u[:, 1] * v[:, 0]
+
+
+# Minimum boundary-to-boundary distance of each polygon pair (P, 2), 0 where
+# the boundaries touch or cross
+def pair_distances(ps, pairs):
+    a, b, _ = _edges(ps)
+    out = np.full(len(pairs), np.inf)
+    for chunk, pid, ea, eb in _pair_edges(ps, pairs[:, 0], pairs[:, 1]):
+        a0, a1, b0, b1 = a[ea], b[ea], a[eb], b[eb]
+        d = np.minimum.reduce([
+            _point_segment(a0, b0, b1), _point_segment(a1, b0, b1),
+            _point_segment(b0, a0, a1), _point_segment(b1, a0, a1),
+        ])
+        crossing = (_cross(a1 - a0, b0 - a0) * _cross(a1 - a0, b1 - a0) < 0) & \
+                   (_cross(b1 - b0, a0 - b0) * _cross(b1 - b0, a1 - b0) < 0)
+        d[crossing] = 0
+        out[chunk] = np.minimum.reduceat(d, np.flatnonzero(np.diff(pid, prepend=-1)))
+    return out
+
+
+# Area shared by each polygon pair (P, 2), one batched sweep over all pairs
+def overlap_areas(ps, pairs):
+    n = len(pairs)
+    if not n:
+        return np.zeros(0)
+    off = ps.offsets
+    both = np.concatenate([pairs[:, 0], pairs[:, 1]])
+    sizes = off[both + 1] - off[both]
+    _, idx = _ranges(off[both], sizes)
+    sub = PolygonSet(ps.vertices[idx], np.concatenate([[0], np.cumsum(sizes)]))
+    edges = _sweep_edges(sub, np.repeat([0, 1], n), np.tile(np.arange(n), 2))
+    trapezoids, group = _sweep(*edges, "and", _eps(ps))
+    result = np.zeros(n)
+    np.add.at(result, group, np.abs(areas(trapezoids)))
+    return result
+
+
+# Narrowest interior distance between facing, antiparallel edges of each
+# polygon (the width of rectangles and paths, the diameter of circles); inf
+# when no edges face each other
+def min_widths(ps):
+    a, b, owner = _edges(ps)
+    n = count(ps)
+    sign = np.sign(areas(ps))
+    out = np.full(n, np.inf)
+    ids = np.arange(n)
+    for chunk, pid, ea, eb in _pair_edges(ps, ids, ids):
+        # facing is symmetric, so each unordered edge pair once
+        upper = ea < eb
+        pid, ea, eb = pid[upper], ea[upper], eb[upper]
+        da, db = b[ea] - a[ea], b[eb] - a[eb]
+        la = np.hypot(*da.T)
+        ua = da / la[:, None]
+        ub = db / np.hypot(*db.T)[:, None]
+        facing = np.sum(ua * ub, axis=1) < -1 + 1e-6
+        d = sign[owner[ea]] * _cross(ua, a[eb] - a[ea])
+        t0 = np.sum((a[eb] - a[ea]) * ua, axis=1)
+        t1 = np.sum((b[eb] - a[ea]) * ua, axis=1)
+        overlap = np.minimum(la, np.maximum(t0, t1)) - np.maximum(0, np.minimum(t0, t1)) > 1e-12
+        d = np.where(facing & overlap & (d > 0), d, np.inf)
+        out[chunk] = np.minimum.reduceat(d, np.flatnonzero(np.diff(pid, prepend=-1)))
+    return out
+
+
+# Local DRC of shapes on one layer before they are committed to the DB:
+# width below min_width, spacing below min_spacing between shapes that do not
+# touch, and overlapping shapes (which merge() would join). Checks left at
+# None are skipped.
+def check_layout(ps, min_width=None, min_spacing=None, overlaps=True):
+    width = spacing = overlap = np.zeros(0, dtype=np.int64)
+    if min_width is not None:
+        width = np.flatnonzero(min_widths(ps) < min_width)
+    if min_spacing is not None or overlaps:
+        pairs = GridIndex(bboxes(ps), margin=min_spacing or 0.0).pairs()
+        touching = np.zeros(len(pairs), dtype=bool)
+        if overlaps:
+            area = overlap_areas(ps, pairs)
+            touching = area > _eps(ps)
+            overlap = pairs[touching]
+        if min_spacing is not None:
+            d = pair_distances(ps, pairs)
+            spacing = pairs[(d > 0) & (d < min_spacing) & ~touching]
+    return DRCResult(width, spacing.reshape(-1, 2), overlap.reshape(-1, 2))
+
+
+def _bench_shapes(n, rng):
+    n_rect, n_path = int(n * 0.8), int(n * 0.1)
+    n_circle = n - n_rect - n_path
+    side = np.sqrt(n) * 2.0
+    p0 = rng.uniform(0, side, (n_rect, 2))
+    rects = rectangles(p0, p0 + rng.uniform(0.1, 1.5, (n_rect, 2)))
+    start = rng.uniform(0, side, (n_path, 2))
+    steps = rng.choice([-1.0, 1.0], (n_path, 2)) * rng.uniform(0.5, 2, (n_path, 2))
+    points = np.stack([start, start + [1, 0] * steps, start + steps], axis=1).reshape(-1, 2)
+    paths = path_polygons(PolygonSet(points, np.arange(0, len(points) + 1, 3)), rng.uniform(0.1, 0.3, n_path))
+    circ = circles(rng.uniform(0, side, (n_circle, 2)), rng.uniform(0.2, 0.6, n_circle), tol=1e-2)
+    return concat(rects, paths, circ)
+
+
+# Benchmark on random rectangles, bent paths and circles at a density where
+# shapes overlap in small clusters: python layout_geometry.py [n_shapes ...]
+if __name__ == "__main__":
+    import sys
+
+    # disjoint, abutting and self-cancelling inputs give empty results
+    a = rectangles([[0, 0], [1.1, 0]], [[1, 1], [2, 1]])
+    drc = check_layout(a, min_spacing=0.2)
+    assert drc.spacing.tolist() == [[0, 1]] and not len(drc.overlaps)
+    abut = rectangles([[0, 0], [1, 0]], [[1, 1], [2, 1]])
+    assert not len(check_layout(abut, min_spacing=0.2).overlaps)
+    assert overlap_areas(abut, np.array([[0, 1]])).tolist() == [0.0]
+    far = rectangles([[100, 100]], [[101, 101]])
+    assert count(boolean(a, far, "and")) == 0 and count(boolean(a, a, "not")) == 0
+    assert np.isclose(np.abs(areas(merge(abut))).sum(), 2)
+
+    rng = np.random.default_rng(0)
+    for n in [int(float(a)) for a in sys.argv[1:]] or [10_000, 100_000, 1_000_000]:
+        timings = {}
+        t = time.perf_counter()
+        ps = _bench_shapes(n, rng)
+        timings["build"] = time.perf_counter() - t
+        t = time.perf_counter()
+        pairs = GridIndex(bboxes(ps), margin=0.2).pairs()
+        timings["index"] = time.perf_counter() - t
+        t = time.perf_counter()
+        drc = check_layout(ps, min_width=0.15, min_spacing=0.2)
+        timings["drc"] = time.perf_counter() - t
+        t = time.perf_counter()
+        merged = merge(ps)
+        timings["merge"] = time.perf_counter() - t
+        print(
+            f"{n:8d} shapes ({len(ps.vertices)} vertices), {len(pairs)} candidate pairs: "
+            f"{len(drc.width)} width, {len(drc.spacing)} spacing, {len(drc.overlaps)} overlap violations, "
+            f"merged into {count(merged)} trapezoids"
+        )
+        print("    " + ", ".join(f"{k} {v:.2f} s" for k, v in timings.items()))
@@ -0,0 +1,318 @@
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+
+# Chebyshev prototype g-values, vectorized across specs
+# ripple_db and N may be scalars or broadcastable arrays; the result has shape
+# batch_shape + (N_max,) with entries beyond a spec's own order set to NaN.
+def chebyshev_gk_batch(ripple_db, N, rounding=True):
+    ripple_db, N = np.broadcast_arrays(
+        np.asarray(ripple_db, dtype=float), np.asarray(N, dtype=np.int64)
+    )
+    if N.size and N.min() < 1:
+        raise ValueError("Filter order N must be >= 1")
+
+    pi = np.pi
+    beta = np.log(1 / np.tanh(ripple_db / 17.37))
+    gamma = np.sinh(beta / (2 * N))
+
+    # ak/bk for every k of every spec in one pass, shape batch_shape + (N_max,)
+    N_max = int(N.max()) if N.size else 0
+    k = np.arange(1, N_max + 1)
+    Nk = N[..., None]
+    ak = np.sin(((2 * k - 1) * pi) / (2 * Nk))
+    bk = gamma[..., None] ** 2 + (np.sin(k * pi / Nk)) ** 2
+
+    # The g-value recurrence is sequential in k but vectorized across specs
+    gk = np.empty(N.shape + (N_max,))
+    if N_max:
+        gk[..., 0] = 2 * ak[..., 0] / gamma
+        if rounding:
+            gk[..., 0] = np.round(gk[..., 0], 4)
+    for j in range(1, N_max):
+        gk[..., j] = (4 * ak[..., j - 1] * ak[..., j]) / (bk[..., j - 1] * gk[..., j - 1])
+        if rounding:
+            gk[..., j] = np.round(gk[..., j], 4)
+    gk[k > Nk] = np.nan
+    return gk
+
+
+# Scale prototype g-values to L (nH, odd k) and C (pF, even k) for fc and R0
+def lpf_scale_prototype(gk, fc, R0, rounding=True):
+    gk = np.asarray(gk, dtype=float)
+    wc = 2 * np.pi * np.asarray(fc, dtype=float)[..., None]  # angular passband freq
+    R0 = np.asarray(R0, dtype=float)[..., None]
+
+    L = (R0 * gk[..., 0::2] / wc) / 1e-9
+    C = (gk[..., 1::2] / (R0 * wc)) / 1e-12
+    if rounding:
+        L = np.round(L, 2)
+        C = np.round(C, 2)
+    return L, C
+
+
+# Estimated attenuation (dB, negative) at fs for an Nth order Chebyshev LPF
+def lpf_attenuation(ripple_db, fc, fs, N, rounding=True):
+    ep = 10 ** (np.asarray(ripple_db, dtype=float) / 10) - 1
+    wc = 2 * np.pi * np.asarray(fc, dtype=float)  # angular passband freq
+    ws = 2 * np.pi * np.asarray(fs, dtype=float)  # angular stopband freq
+
+    La = 0 - 10 * np.log10(1 + ep * np.cosh((N * np.arccosh(ws / wc))) ** 2)
+    if rounding:
+        La = np.round(La, 2)
+    return La
+
+
+# Chebyshev LPF Designer - batch version
+# All spec arguments may be scalars or broadcastable NumPy arrays. Results are
+# returned as arrays of shape batch_shape + (N_max,) for gk and the matching
+# halves for L (odd k) and C (even k); entries beyond a spec's own order are
+# padded with NaN. With rounding=True the values match lpf_design_by_N exactly.
+def lpf_design_batch(ripple_db, fc, fs, R0, N, rounding=True):
+    ripple_db, fc, fs, R0, N = np.broadcast_arrays(
+        np.asarray(ripple_db, dtype=float),
+        np.asarray(fc, dtype=float),
+        np.asarray(fs, dtype=float),
+        np.asarray(R0, dtype=float),
+        np.asarray(N, dtype=np.int64),
+    )
+    gk = chebyshev_gk_batch(ripple_db, N, rounding=rounding)
+    L, C = lpf_scale_prototype(gk, fc, R0, rounding=rounding)
+    La = lpf_attenuation(ripple_db, fc, fs, N, rounding=rounding)
+    return L, C, N, La, gk
+
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])
+
+
+# Bounded LRU cache of Chebyshev prototype g-values keyed by (ripple_db, N).
+# The g-values do not depend on fc or R0, so once a prototype is cached a new
+# design is just lpf_scale_prototype(). With a path the table is loaded from
+# and saved to a compact .npz file (ripple, order, rounding, padded g-values).
+class PrototypeCache:
+    def __init__(self, maxsize=4096, path=None):
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._table = OrderedDict()
+        self._lock = threading.Lock()
+        if path is not None and os.path.exists(path):
+            self.load(path)
+
+    def get(self, ripple_db, N, rounding=True):
+        key = (float(ripple_db), int(N), bool(rounding))
+        with self._lock:
+            gk = self._table.get(key)
+            if gk is not None:
+                self._table.move_to_end(key)
+                self.hits += 1
+                return gk
+            self.misses += 1
+
+        gk = chebyshev_gk_batch(key[0], key[1], rounding=key[2])
+        gk.setflags(write=False)
+        with self._lock:
+            self._insert(key, gk)
+        return gk
+
+    def _insert(self, key, gk):
+        self._table[key] = gk
+        self._table.move_to_end(key)
+        while len(self._table) > self.maxsize:
+            self._table.popitem(last=False)
+
+    def cache_info(self):
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._table))
+
+    def cache_clear(self):
+        with self._lock:
+            self._table.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def save(self, path=None):
+        path = path or self.path
+        if path is None:
+            raise ValueError("No path given to save the prototype cache")
+        with self._lock:
+            keys = list(self._table)
+            N_max = max((k[1] for k in keys), default=0)
+            gk = np.full((len(keys), N_max), np.nan)
+            for i, key in enumerate(keys):
+                gk[i, : key[1]] = self._table[key]
+        # through a file handle, so savez does not append .npz to the path
+        # that __init__ and load() look for
+        with open(path, "wb") as f:
+            np.savez_compressed(
+                f,
+                ripple_db=np.array([k[0] for k in keys], dtype=float),
+                N=np.array([k[1] for k in keys], dtype=np.int64),
+                rounding=np.array([k[2] for k in keys], dtype=bool),
+                gk=gk,
+            )
+
+    def load(self, path):
+        with np.load(path) as table:
+            rows = zip(table["ripple_db"], table["N"], table["rounding"], table["gk"])
+            with self._lock:
+                for ripple_db, N, rounding, gk in rows:
+                    gk = gk[:N].copy()
+                    gk.setflags(write=False)
+                    self._insert((float(ripple_db), int(N), bool(rounding)), gk)
+
+
+# Shared prototype cache used by lpf_design_by_N / lpf_design_by_Atten
+prototype_cache = PrototypeCache()
+
+
+# Smallest filter order N whose attenuation at fs meets La (dB, positive).
+# Closed form N = ceil(arccosh(sqrt((10^(La/10) - 1) / ep)) / arccosh(ws/wc)),
+# then a one-step check against the attenuation guards the ceil against
+# floating point error. Both are evaluated in log space, as 10^(La/10) and
+# cosh(N * arccosh(ws/wc))^2 overflow for large La or N. Inputs may be
+# broadcastable arrays. odd_only rounds up to the next odd order for equally
+# terminated ladders. Raises ValueError when no finite order results, e.g.
+# for an infinite La or a ripple_db that is not positive.
+def lpf_min_order(ripple_db, fc, fs, La, odd_only=False):
+    ripple_db, fc, fs, La = np.broadcast_arrays(
+        np.asarray(ripple_db, dtype=float),
+        np.asarray(fc, dtype=float),
+        np.asarray(fs, dtype=float),
+        np.asarray(La, dtype=float),
+    )
+    if np.any(fs <= fc):
+        raise ValueError("Stopband frequency fs must be above the cutoff fc")
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_ep = np.log(np.expm1(ripple_db * np.log(10) / 10))
+        # log(10^(La/10) - 1), clipped at need = 1 for La <= 0
+        a = La * np.log(10) / 10
+        log_need = np.maximum(np.where(a > 0, a + np.log(-np.expm1(-a)), -np.inf) - log_ep, 0)
+        # arccosh(sqrt(need)) = log(sqrt(need) + sqrt(need - 1))
+        x = 0.5 * log_need + np.log1p(np.sqrt(-np.expm1(-log_need)))
+        N = np.ceil(x / np.arccosh(fs / fc))
+    if not np.all(np.isfinite(N)) or np.any(np.isnan(La)):
+        raise ValueError("No finite filter order meets La, check ripple_db and La")
+    N = np.maximum(N, 1).astype(np.int64)
+
+    # Step down if N - 1 already meets the spec, up if N falls just short:
+    # 10 * log10(1 + ep * cosh(x)^2) >= La with log(cosh(x)) taken stably
+    def meets(n):
+        x = n * np.arccosh(fs / fc)
+        log_cosh = x + np.log1p(np.exp(-2 * x)) - np.log(2)
+        return 10 / np.log(10) * np.logaddexp(0, log_ep + 2 * log_cosh) >= La
+
+    N = np.where((N > 1) & meets(np.maximum(N - 1, 1)), N - 1, N)
+    N = np.where(meets(N), N, N + 1)
+    if odd_only:
+        N = N + (N % 2 == 0)
+    return N
+
+
+# Attenuation at fs (dB, negative) for every order 1..N_max, shape
+# batch_shape + (N_max,), so a spec can be checked against all orders at once
+def lpf_order_sweep(ripple_db, fc, fs, N_max):
+    N = np.arange(1, N_max + 1)
+    return lpf_attenuation(
+        np.asarray(ripple_db, dtype=float)[..., None],
+        np.asarray(fc, dtype=float)[..., None],
+        np.asarray(fs, dtype=float)[..., None],
+        N,
+        rounding=False,
+    )
+
+
+def lpf_design_batch_by_Atten(ripple_db, fc, fs, R0, La, rounding=True, odd_only=True):
+    N = lpf_min_order(ripple_db, fc, fs, La, odd_only=odd_only)
+    return lpf_design_batch(ripple_db, fc, fs, R0, N, rounding=rounding)
+
+
+# Chebyshev LPF Designer for a single spec, returns plain lists as before
+# The g-values come from the shared prototype cache
+def lpf_design_by_N(ripple_db, fc, fs, R0, N):
+    gk = prototype_cache.get(ripple_db, N)
+    L, C = lpf_scale_prototype(gk, fc, R0)
+    La = lpf_attenuation(ripple_db, fc, fs, N)
+    return L.tolist(), C.tolist(), int(N), float(La), gk.tolist()
+
+
+# The order is the smallest one meeting La at fs; odd by default since the
+# ladder is terminated in R0 at both ends
+def lpf_design_by_Atten(ripple_db, fc, fs, R0, La, odd_only=True):
+    N = int(lpf_min_order(ripple_db, fc, fs, La, odd_only=odd_only))
+    return lpf_design_by_N(ripple_db, fc, fs, R0, N)
+
+
+# Original per-k loop implementation, kept as the benchmark reference
+def _lpf_design_by_N_loop(ripple_db, fc, fs, R0, N):
+    ep = 10 ** (ripple_db / 10) - 1
+    pi = np.pi
+    wc = 2 * pi * fc
+    ws = 2 * pi * fs
+
+    La = 0 - 10 * np.log10(1 + ep * np.cosh((N * np.arccosh(ws / wc))) ** 2)
+    La = round(La, 2)
+
+    beta = np.log(1 / np.tanh(ripple_db / 17.37))
+    gamma = np.sinh(beta / (2 * N))
+
+    L = []
+    C = []
+    ak = []
+    bk = []
+    gk = []
+
+    for k in range(1, N + 1):
+        ak.append(np.sin(((2 * k - 1) * pi) / (2 * N)))
+        bk.append(gamma**2 + (np.sin(k * pi / N)) ** 2)
+
+    for k in range(1, N + 1):
+        if k == 1:
+            gk.append(round(2 * ak[k - 1] / gamma, 4))
+        else:
+            gk.append(round((4 * ak[k - 2] * ak[k - 1]) / (bk[k - 2] * gk[k - 2]), 4))
+
+        if k % 2 != 0:
+            L.append(round(((R0 * gk[k - 1] / wc) / 1e-9), 2))
+        else:
+            C.append(round((gk[k - 1] / (R0 * wc)) / 1e-12, 2))
+
+    return L, C, N, La, gk
+
+
+def _random_specs(n, seed=0):
+    rng = np.random.default_rng(seed)
+    ripple_db = rng.choice([0.01, 0.05, 0.1, 0.2, 0.5, 1.0], n)
+    fc = rng.uniform(100e6, 5000e6, n)
+    fs = fc * rng.uniform(1.2, 3.0, n)
+    R0 = rng.choice([25, 50, 75], n)
+    N = rng.integers(1, 16, n)
+    return ripple_db, fc, fs, R0, N
+
+
+# Benchmark: python lpf_synthesis.py [n_specs ...]
+if __name__ == "__main__":
+    import sys
+
+    sizes = [int(float(s)) for s in sys.argv[1:]] or [1000, 100000, 1000000]
+    for n in sizes:
+        specs = _random_specs(n)
+
+        t0 = time.perf_counter()
+        lpf_design_batch(*specs)
+        t_batch = time.perf_counter() - t0
+
+        # The loop version is timed on at most 1e4 specs and scaled up
+        n_loop = min(n, 10000)
+        t0 = time.perf_counter()
+        for i in range(n_loop):
+            _lpf_design_by_N_loop(*(float(s[i]) for s in specs[:4]), int(specs[4][i]))
+        t_loop = (time.perf_counter() - t0) * n / n_loop
+
+        print(f"{n:>9d} specs: batch {t_batch:8.3f} s, loop {t_loop:8.3f} s, speedup {t_loop / t_batch:7.1f}x")
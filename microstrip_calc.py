@@ -0,0 +1,150 @@
+import numpy as np
+
+
+# Compute Microstrip implementation values for LPF design
+# Er, H_mm and Z0 may be scalars or broadcastable arrays; both the high and the
+# low impedance closed forms are evaluated and selected per element, so a whole
+# substrate/impedance sweep is one call. Scalar inputs return a NumPy scalar.
+def microstrip_calc_fromZ0(Er, H_mm, Z0):
+    Er, H_mm, Z0 = np.broadcast_arrays(
+        np.asarray(Er, dtype=float),
+        np.asarray(H_mm, dtype=float),
+        np.asarray(Z0, dtype=float),
+    )
+    WH_high, WH_low = _microstrip_WH_branches(Er, Z0)
+    WH = np.where(Z0 > 40 - 2 * Er, WH_high, WH_low)
+    calc_w = WH * H_mm
+    return calc_w[()]
+
+
+# W/H from the high and the low impedance closed forms, NaN where undefined
+def _microstrip_WH_branches(Er, Z0):
+    with np.errstate(invalid="ignore", divide="ignore", over="ignore"):
+        # High Impedance calculation
+        Heff = Z0 * np.sqrt(2 * (Er + 1)) / 119.9 + 1 / 2 * ((Er - 1) / (Er + 1)) * (
+            np.log(np.pi / 2) + ((1 / Er) * np.log(4 / np.pi))
+        )
+        WH_high = 1 / (np.exp(Heff) / 8 - 1 / (4 * np.exp(Heff)))
+
+        # Low Impedance calculation
+        der = 59.95 * pow(np.pi, 2) / (Z0 * np.sqrt(Er))
+        WH_low = (2 / np.pi) * ((der - 1) - np.log(2 * der - 1)) + (
+            (Er - 1) / (np.pi * Er)
+        ) * (np.log(der - 1) + 0.293 - (0.517 / Er))
+    return WH_high, WH_low
+
+
+# Precomputed W/H table over a uniform (Er, Z0) grid. W/H does not depend on the
+# substrate height, so lookups scale by H_mm and answer in O(1) per point with
+# bilinear interpolation. Each closed form is tabulated separately and the
+# branch is picked per point, so cells straddling Z0 = 40 - 2*Er do not blend
+# the two formulas. Points outside the grid are clamped to its edges.
+class MicrostripWidthTable:
+    def __init__(self, Er_range=(1.0, 13.0), Z0_range=(10.0, 200.0), n_Er=241, n_Z0=1901):
+        self.Er = np.linspace(*Er_range, n_Er)
+        self.Z0 = np.linspace(*Z0_range, n_Z0)
+        self.WH_high, self.WH_low = _microstrip_WH_branches(self.Er[:, None], self.Z0[None, :])
+
+    def __call__(self, Er, H_mm, Z0):
+        Er, H_mm, Z0 = np.broadcast_arrays(
+            np.asarray(Er, dtype=float),
+            np.asarray(H_mm, dtype=float),
+            np.asarray(Z0, dtype=float),
+        )
+        i, ti = self._locate(self.Er, Er)
+        j, tj = self._locate(self.Z0, Z0)
+        WH = np.where(
+            Z0 > 40 - 2 * Er,
+            self._interp(self.WH_high, i, j, ti, tj),
+            self._interp(self.WH_low, i, j, ti, tj),
+        )
+        return (WH * H_mm)[()]
+
+    @staticmethod
+    def _interp(table, i, j, ti, tj):
+        return (
+            table[i, j] * (1 - ti) * (1 - tj)
+            + table[i + 1, j] * ti * (1 - tj)
+            + table[i, j + 1] * (1 - ti) * tj
+            + table[i + 1, j + 1] * ti * tj
+        )
+
+    @staticmethod
+    def _locate(grid, x):
+        # Cell index and fractional position on a uniform grid
+        step = grid[1] - grid[0]
+        pos = np.clip((x - grid[0]) / step, 0, len(grid) - 1)
+        idx = np.minimum(pos.astype(np.int64), len(grid) - 2)
+        return idx, pos - idx
+
+
+# Hammerstad-Jensen microstrip forward model
+# Returns (Z0, eps_eff) for line width W_mm on a substrate of height H_mm,
+# relative permittivity Er and conductor thickness T_mm (quasi-static, no
+# dispersion). All arguments may be broadcastable arrays.
+def microstrip_Z0(W_mm, H_mm, Er, T_mm=0.0):
+    W_mm, H_mm, Er, T_mm = np.broadcast_arrays(
+        np.asarray(W_mm, dtype=float),
+        np.asarray(H_mm, dtype=float),
+        np.asarray(Er, dtype=float),
+        np.asarray(T_mm, dtype=float),
+    )
+    u = W_mm / H_mm
+    t = T_mm / H_mm
+
+    # Width correction for a conductor of finite thickness
+    with np.errstate(divide="ignore", invalid="ignore"):
+        du1 = t / np.pi * np.log(1 + 4 * np.e / (t / np.tanh(np.sqrt(6.517 * u)) ** 2))
+    du1 = np.where(t > 0, du1, 0.0)
+    dur = 0.5 * (1 + 1 / np.cosh(np.sqrt(Er - 1))) * du1
+    u1 = u + du1
+    ur = u + dur
+
+    er_eff = _eps_eff_HJ(ur, Er)
+    Z0 = _Z0_air_HJ(ur) / np.sqrt(er_eff)
+    eps_eff = er_eff * (_Z0_air_HJ(u1) / _Z0_air_HJ(ur)) ** 2
+    return Z0[()], eps_eff[()]
+
+
+def _Z0_air_HJ(u):
+    eta0 = 376.730313
+    f = 6 + (2 * np.pi - 6) * np.exp(-((30.666 / u) ** 0.7528))
+    return eta0 / (2 * np.pi) * np.log(f / u + np.sqrt(1 + (2 / u) ** 2))
+
+
+def _eps_eff_HJ(u, Er):
+    a = (
+        1
+        + np.log((u**4 + (u / 52) ** 2) / (u**4 + 0.432)) / 49
+        + np.log(1 + (u / 18.1) ** 3) / 18.7
+    )
+    b = 0.564 * ((Er - 0.9) / (Er + 3)) ** 0.053
+    return (Er + 1) / 2 + (Er - 1) / 2 * (1 + 10 / u) ** (-a * b)
+
+
+# Microstrip width (mm) for a target Z0 using the Hammerstad-Jensen model.
+# Starts from the closed form microstrip_calc_fromZ0 and runs a vectorized
+# Newton iteration on ln(W) with a finite-difference slope until every point
+# is within rel_tol of its target impedance.
+def microstrip_W_fromZ0(Er, H_mm, Z0, T_mm=0.0, rel_tol=1e-6, max_iter=50):
+    Er, H_mm, Z0, T_mm = np.broadcast_arrays(
+        np.asarray(Er, dtype=float),
+        np.asarray(H_mm, dtype=float),
+        np.asarray(Z0, dtype=float),
+        np.asarray(T_mm, dtype=float),
+    )
+    x = np.log(np.clip(microstrip_calc_fromZ0(Er, 1.0, Z0), 1e-3, 1e3) * H_mm)
+    h = 1e-6
+
+    for _ in range(max_iter):
+        Zx = np.asarray(microstrip_Z0(np.exp(x), H_mm, Er, T_mm)[0])
+        err = Zx - Z0
+        if np.all(np.abs(err) <= rel_tol * Z0):
+            break
+        slope = (np.asarray(microstrip_Z0(np.exp(x + h), H_mm, Er, T_mm)[0]) - Zx) / h
+        # Z0 falls monotonically with width; limit each step to a factor of e
+        x = x - np.clip(err / slope, -1.0, 1.0)
+    else:
+        raise RuntimeError(f"Microstrip width did not converge within {max_iter} iterations")
+
+    return np.exp(x)[()]
@@ -0,0 +1,151 @@
+import difflib
+import os
+
+# ADS netlist text written straight from synthesized values, using the
+# components, instance names and value strings the schematics of 5_lumpded_
+# and 5_microstrip_ are built with. This is not yet a replacement for
+# design.generate_netlist(): node names, option strings and VAR ordering
+# follow the schematics but have not been compared with a captured netlist.
+# 5_lumpded_ and 5_microstrip_ capture generate_netlist() under GOLDEN_DIR on
+# their first ADS run and report the diff of the writer's output against it;
+# only with those golden files committed and the diffs empty can the writer
+# feed simulator.run_netlist() in place of the schematic.
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden")
+
+OPTIONS = (
+    "Options ResourceUsage=yes UseNutmegFormat=no EnableOptim=no "
+    'TopDesignName="{top}" DcopOutputNodeVoltages=yes DcopOutputPinCurrents=yes '
+    "DcopOutputAllSweepPoints=no DcopOutputDcopType=0"
+)
+
+S_PARAM = (
+    "S_Param:{name} CalcS=yes CalcY=no CalcZ=no GroupDelayAperture=1e-4 FreqConversion=no "
+    "FreqConversionPort=1 StatusLevel=2 CalcNoise=no SortNoise=0 BandwidthForNoise=1.0 Hz "
+    "DevOpPtLevel=0 \\\n"
+    "Start={start} Stop={stop} Step={step}"
+)
+
+MSUB = (
+    "MSUB:{name}  H={H} mm Er={Er} Mur=1 Cond=5.8E7 Hu=1e+33 mm T={T} mm TanD={tanD} "
+    "Rough=0 mm DielectricLossModel=1 FreqForEpsrTanD=1.0 GHz LowFreqForTanD=1.0 kHz "
+    "HighFreqForTanD=1.0 THz RoughnessModel=2"
+)
+
+
+# Frequencies as the schematics write them: str() of the value in GHz, or a
+# value string such as "0.001 GHz" used as is
+def _ghz(hz):
+    return hz if isinstance(hz, str) else f"{hz / 1e9} GHz"
+
+
+def _header(top):
+    return [
+        f'; Top Design: "{top}"',
+        '; Netlisted using Hierarchy Policy: "Standard"',
+        "",
+        OPTIONS.format(top=top),
+        "",
+    ]
+
+
+def _port(name, num, node):
+    return f"Port:{name}  {node} 0 Num={num} Z=50 Ohm Noise=yes"
+
+
+# Lumped ladder as built by 5_lumpded_lpf_synthesis.py: series L1..Ln and
+# shunt C1..Cm to ground between TermG ports, values in VAR1 (nH/pF) and an
+# S_Param sweep from start to stop (Hz)
+def lc_ladder_netlist(L, C, start, stop, step, top="tutorial5_lib:python_filter_schematic:schematic"):
+    lines = _header(top)
+    lines.append(_port("TermG1", 1, "N__0"))
+    for i in range(len(L)):
+        lines.append(f"L:L{i + 1}  N__{i} N__{i + 1} L=L{i + 1} nH Noise=yes")
+        if i < len(C):
+            lines.append(f"C:C{i + 1}  N__{i + 1} 0 C=C{i + 1} pF")
+    lines.append(_port("TermG2", 2, f"N__{len(L)}"))
+    for i, value in enumerate(L):
+        lines.append(f"L{i + 1}={value}")
+    for i, value in enumerate(C):
+        lines.append(f"C{i + 1}={value}")
+    lines.append(S_PARAM.format(name="SP1", start=_ghz(start), stop=_ghz(stop), step=_ghz(step)))
+    return "\n".join(lines) + "\n"
+
+
+# Stepped-impedance microstrip LPF as built by 5_microstrip_lpf_synthesis.py:
+# Term1/Term2, 50 Ohm feed lines IP_50/OP_50, alternating TL_L/TL_C MLIN
+# sections whose lengths and widths are VAR1/VAR2 variables, MSub1 and SP1
+# (Hz). values may override the per-section Line_*/w_ind*/w_cap* values, e.g.
+# with the tuned values of optimize_stepped_impedance(); they are rounded to
+# digits decimals as write_vars() does for the VAR blocks.
+def stepped_impedance_netlist(
+    Line_L, Line_C, w_ind, w_cap, w50, Er, H_mm, T_mm, tanD, Feed_Length,
+    start, stop, step, values=None, digits=3, top="Demo_Python_LPF_lib:cell_lpf1:schematic",
+):
+    variables = {}
+    for i, length in enumerate(Line_L):
+        variables[f"Line_L{i + 1}"] = length
+        variables[f"w_ind{i + 1}"] = w_ind
+    for i, length in enumerate(Line_C):
+        variables[f"Line_C{i + 1}"] = length
+        variables[f"w_cap{i + 1}"] = w_cap
+    variables["w50"] = w50
+    variables.update({name: round(value, digits) for name, value in (values or {}).items()})
+
+    mlin = 'MLIN:{name}  {a} {b} Subst="MSub1" W={W} mm L={L} mm Wall1=1.0E+30 mm Wall2=1.0E+30 mm Mod=1'
+    lines = _header(top)
+    lines.append(_port("Term1", 1, "N__0"))
+    lines.append(mlin.format(name="IP_50", a="N__0", b="N__1", W="w50", L=Feed_Length))
+    node = 1
+    for k in range(max(len(Line_L), len(Line_C))):
+        for kind, n, width in (("L", len(Line_L), "w_ind"), ("C", len(Line_C), "w_cap")):
+            if k < n:
+                lines.append(mlin.format(
+                    name=f"TL_{kind}{k + 1}", a=f"N__{node}", b=f"N__{node + 1}",
+                    W=f"{width}{k + 1}", L=f"Line_{kind}{k + 1}",
+                ))
+                node += 1
+    lines.append(mlin.format(name="OP_50", a=f"N__{node}", b=f"N__{node + 1}", W="w50", L=Feed_Length))
+    lines.append(_port("Term2", 2, f"N__{node + 1}"))
+    for name, value in variables.items():
+        lines.append(f"{name}={value}")
+    lines.append(S_PARAM.format(name="SP1", start=_ghz(start), stop=_ghz(stop), step=_ghz(step)))
+    lines.append(MSUB.format(name="MSub1", H=H_mm, Er=Er, T=T_mm, tanD=tanD))
+    return "\n".join(lines) + "\n"
+
+
+# Golden files are netlists captured from design.generate_netlist() for the
+# same topology and values, e.g. save_golden(design.generate_netlist(), path)
+# once per ADS release. check_golden() returns the unified diff against the
+# golden file (empty when byte-identical) or None when there is none yet.
+def save_golden(netlist, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", newline="") as f:
+        f.write(netlist)
+
+
+def check_golden(netlist, path):
+    try:
+        with open(path, newline="") as f:
+            golden = f.read()
+    except FileNotFoundError:
+        return None
+    if golden == netlist:
+        return []
+    return list(difflib.unified_diff(
+        golden.splitlines(keepends=True), netlist.splitlines(keepends=True), path, "emitted"
+    ))
+
+
+# Check the writer against the schematic it mirrors: generated is
+# design.generate_netlist() of that schematic, saved to path as the golden
+# file when there is none yet, and emitted is the writer's netlist for the
+# same values. Returns the diff of emitted against the golden file, empty
+# when byte-identical. Raises RuntimeError when generated no longer matches
+# an existing golden file, e.g. after an ADS update; delete it to recapture.
+def check_against_schematic(emitted, generated, path):
+    if not os.path.exists(path):
+        save_golden(generated, path)
+    elif check_golden(generated, path):
+        raise RuntimeError(f"generate_netlist() no longer matches {path}, recapture it for this ADS release")
+    return check_golden(emitted, path)
@@ -0,0 +1,212 @@
+import time
+from collections import namedtuple
+
+import numpy as np
+
+# Pole-residue model H(s) = sum_i residues[..., i] / (s - poles[i]) + d + s e
+# with s = j 2 pi f / scale. poles are shared by all traces and come in
+# complex conjugate pairs (real poles appear once); residues, d and e have the
+# traces' leading shape. Evaluate with rational_eval().
+RationalModel = namedtuple("RationalModel", ["poles", "residues", "d", "e", "scale"])
+
+
+def _basis(s, poles):
+    # Real basis of Gustavsen's vector fitting: one column per real pole and
+    # two per conjugate pair, 1/(s-p) + 1/(s-p*) and j/(s-p) - j/(s-p*)
+    cols = []
+    for p in poles:
+        if p.imag == 0:
+            cols.append(1 / (s - p))
+        elif p.imag > 0:
+            cols.append(1 / (s - p) + 1 / (s - p.conjugate()))
+            cols.append(1j / (s - p) - 1j / (s - p.conjugate()))
+    return np.column_stack(cols)
+
+
+def _realify(A):
+    return np.concatenate([A.real, A.imag])
+
+
+# Poles of sigma(s) = 1 + sum c_i phi_i(s), the zeros that replace the poles
+# in the next iteration, as eigenvalues of A - b c^T in real block form
+def _sigma_zeros(poles, c):
+    n = len(c)
+    A = np.zeros((n, n))
+    b = np.zeros(n)
+    k = 0
+    for p in poles:
+        if p.imag == 0:
+            A[k, k] = p.real
+            b[k] = 1
+            k += 1
+        elif p.imag > 0:
+            A[k:k + 2, k:k + 2] = [[p.real, p.imag], [-p.imag, p.real]]
+            b[k] = 2
+            k += 2
+    zeros = np.asarray(np.linalg.eigvals(A - np.outer(b, c)), dtype=complex)
+    # flip unstable poles into the left half plane
+    zeros = np.where(zeros.real > 0, -zeros.conjugate(), zeros)
+    zeros = zeros[zeros.imag >= 0]
+    zeros.imag[np.abs(zeros.imag) < 1e-12 * np.abs(zeros)] = 0
+    return np.sort_complex(zeros)
+
+
+def _fit_residues(s, H, poles, with_e):
+    Phi = _basis(s, poles)
+    cols = [Phi, np.ones((len(s), 1))] + ([s[:, None]] if with_e else [])
+    A = _realify(np.column_stack(cols))
+    x = np.linalg.lstsq(A, _realify(H.T), rcond=None)[0]
+    n = Phi.shape[1]
+    # back to complex residues of the full pole list
+    residues, full_poles, k = [], [], 0
+    for p in poles:
+        if p.imag == 0:
+            residues.append(x[k] + 0j)
+            full_poles.append(p)
+            k += 1
+        else:
+            r = x[k] + 1j * x[k + 1]
+            residues += [r, r.conjugate()]
+            full_poles += [p, p.conjugate()]
+            k += 2
+    d = x[n]
+    e = x[n + 1] if with_e else np.zeros_like(d)
+    return np.array(full_poles), np.array(residues).T, d, e
+
+
+# Fit a rational model with n_poles poles (rounded up to an even number of
+# conjugate pairs) to S-parameter traces S of shape (traces..., freq) over
+# freq in Hz with vector fitting: starting poles spread over the band are
+# relocated n_iter times by solving for a common sigma(s) over all traces,
+# using the QR-reduced ("fast") formulation so the cost grows linearly with
+# the number of traces. with_e adds the proportional s*e term.
+def vector_fit(freq, S, n_poles=10, n_iter=8, with_e=False):
+    freq = np.asarray(freq, dtype=float)
+    S = np.asarray(S, dtype=complex)
+    shape = S.shape[:-1]
+    H = S.reshape(-1, len(freq))
+    scale = 2 * np.pi * freq.max()
+    s = 2j * np.pi * freq / scale
+
+    n_pairs = max(1, -(-n_poles // 2))
+    beta = np.linspace(max(freq.min() / freq.max(), 1e-3), 1, n_pairs)
+    poles = -beta / 100 + 1j * beta
+
+    n_d = 2 if with_e else 1
+    for _ in range(n_iter):
+        Phi = _basis(s, poles)
+        n = Phi.shape[1]
+        base = np.column_stack([Phi, np.ones((len(s), 1))] + ([s[:, None]] if with_e else []))
+        rows, rhs = [], []
+        for h in H:
+            A = _realify(np.column_stack([base, -Phi * h[:, None]]))
+            Q, R = np.linalg.qr(A)
+            # rows that only involve the sigma coefficients
+            rows.append(R[n + n_d:, n + n_d:])
+            rhs.append(Q[:, n + n_d:].T @ np.concatenate([h.real, h.imag]))
+        c = np.linalg.lstsq(np.vstack(rows), np.concatenate(rhs), rcond=None)[0]
+        poles = _sigma_zeros(poles, c)
+
+    full_poles, residues, d, e = _fit_residues(s, H, poles, with_e)
+    n_full = len(full_poles)
+    return RationalModel(
+        full_poles, residues.reshape(shape + (n_full,)), d.reshape(shape), e.reshape(shape), scale
+    )
+
+
+# Evaluate a RationalModel at freq (Hz), result of shape (traces..., freq)
+def rational_eval(model, freq):
+    s = 2j * np.pi * np.asarray(freq, dtype=float) / model.scale
+    out = model.residues @ (1 / (s[None, :] - model.poles[:, None]))
+    return out + model.d[..., None] + model.e[..., None] * s
+
+
+# RMS error of a fit relative to the RMS of the data
+def rational_error(model, freq, S):
+    S = np.asarray(S, dtype=complex)
+    return np.sqrt(np.mean(np.abs(rational_eval(model, freq) - S) ** 2) / np.mean(np.abs(S) ** 2))
+
+
+# Rational models of a swept result, e.g. S[2,1] and S[1,1] over the Er x freq
+# sweep of 6_: one model per value of the sweep variable (axis) stored as
+# stacked arrays. Calling it with freq and a sweep value evaluates the
+# order + 1 models nearest to value and combines them with Lagrange weights
+# (cubic by default, which follows the resonances moving with Er far better
+# than linear blending), so queries off both grids cost a few rational
+# evaluations instead of a simulation.
+class RationalSweep:
+    def __init__(self, axis, models, order=3):
+        self.axis = np.asarray(axis, dtype=float)
+        self.models = list(models)
+        self.order = order
+
+    @classmethod
+    def fit(cls, axis, freq, S, n_poles=10, n_iter=8, with_e=False):
+        # S has shape (len(axis), traces..., freq)
+        return cls(axis, [vector_fit(freq, S_i, n_poles, n_iter, with_e) for S_i in S])
+
+    def __call__(self, freq, value):
+        k = min(self.order + 1, len(self.axis))
+        i = np.searchsorted(self.axis, value) - k // 2
+        idx = np.arange(k) + int(np.clip(i, 0, len(self.axis) - k))
+        xs = self.axis[idx]
+        out = 0
+        for j in range(k):
+            others = np.delete(xs, j)
+            w = np.prod((value - others) / (xs[j] - others))
+            out = out + w * rational_eval(self.models[idx[j]], freq)
+        return out
+
+    def save(self, path):
+        arrays = {"axis": self.axis, "order": self.order}
+        for i, m in enumerate(self.models):
+            for field, value in m._asdict().items():
+                arrays[f"{i}_{field}"] = value
+        np.savez_compressed(path, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as f:
+            axis = f["axis"]
+            models = [
+                RationalModel(*(f[f"{i}_{field}"] for field in RationalModel._fields))
+                for i in range(len(axis))
+            ]
+            return cls(axis, models, int(f["order"]))
+
+
+# Benchmark on the stepped-impedance LPF of 6_ swept over Er from 3 to 4:
+# python rational_model.py
+if __name__ == "__main__":
+    from abcd_cascade import freq_grid, stepped_impedance_sparams
+
+    # first-order response, the sigma zeros come back as an all-real array
+    f = np.linspace(1e6, 1e9, 200)
+    first = 1 / (2j * np.pi * f / 1e9 + 0.3)
+    assert rational_error(vector_fit(f, first, n_poles=2), f, first) < 1e-9
+
+    Line_L = [5.67, 10.06, 10.06, 5.67]
+    Line_C = [5.33, 5.89, 5.33]
+    Er = np.round(np.arange(3, 4.01, 0.1), 2)
+    freq = freq_grid(0.001e9, 5.25e9, 3.5e9 / 400)
+
+    def simulate(Er, freq):
+        S11, S21 = stepped_impedance_sparams(
+            Line_L, Line_C, 0.11, 5.5, 1.09, np.asarray(Er), 0.508, freq, T_mm=0.017, tanD=0.0023
+        )
+        return np.stack([S21, S11], axis=-2)
+
+    S = simulate(Er, freq)
+    t0 = time.perf_counter()
+    sweep = RationalSweep.fit(Er, freq, S, n_poles=24)
+    print(f"fit {len(Er)} x 2 traces x {len(freq)} points in {time.perf_counter() - t0:.2f} s")
+    print("worst relative RMS error on the grid:", max(rational_error(m, freq, s) for m, s in zip(sweep.models, S)))
+
+    dense = np.linspace(0.001e9, 5.25e9, 1000)
+    t0 = time.perf_counter()
+    n = 200
+    for _ in range(n):
+        sweep(dense, 3.55)
+    print(f"evaluate {len(dense)} points at Er=3.55: {(time.perf_counter() - t0) / n * 1e6:.0f} us")
+    err = np.abs(sweep(dense, 3.55) - simulate(3.55, dense)).max()
+    print(f"max |S| error at Er=3.55 (between sweep points): {err:.2e}")
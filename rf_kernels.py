@@ -0,0 +1,70 @@
+import numpy as np
+
+
+# RF post-processing on complex S-parameter arrays of shape (sweep..., freq),
+# e.g. the values of load_varblock / open_export. Frequency is the last axis
+# and freq is a 1-D array in Hz. Everything works on NumPy arrays directly so
+# new measurements can be derived from stored data without re-simulating.
+
+
+# Magnitude in dB, 20*log10(|S|)
+def db(S):
+    with np.errstate(divide="ignore"):
+        return 20 * np.log10(np.abs(S))
+
+
+# Phase in degrees, optionally unwrapped along frequency
+def phase_deg(S, unwrap=True):
+    ph = np.angle(S)
+    if unwrap:
+        ph = np.unwrap(ph, axis=-1)
+    return np.degrees(ph)
+
+
+# Group delay in seconds, -d(phase)/d(omega) of the unwrapped phase. Matches the
+# MeasEqn groupdelay=(-1/360)*diff(unwrap(phase(S(2,1))))/diff(freq), which has
+# one point less than freq; with centered=True np.gradient is used instead and
+# the result has the same length as freq.
+def group_delay(S, freq, centered=False):
+    ph = np.unwrap(np.angle(S), axis=-1)
+    freq = np.asarray(freq, dtype=float)
+    if centered:
+        return -np.gradient(ph, 2 * np.pi * freq, axis=-1)
+    return -np.diff(ph, axis=-1) / (2 * np.pi * np.diff(freq))
+
+
+# Return loss in dB (positive for a passive port), -20*log10(|S11|)
+def return_loss(S11):
+    return -db(S11)
+
+
+# Insertion loss in dB (positive for a passive two-port), -20*log10(|S21|)
+def insertion_loss(S21):
+    return -db(S21)
+
+
+def vswr(S11):
+    mag = np.abs(S11)
+    with np.errstate(divide="ignore"):
+        return (1 + mag) / (1 - mag)
+
+
+# All of the above for a two-port in one pass over the data, sharing |S| and
+# the unwrapped S21 phase. Returns a dict of arrays keyed by metric name.
+def two_port_metrics(S11, S21, freq):
+    mag11 = np.abs(S11)
+    mag21 = np.abs(S21)
+    with np.errstate(divide="ignore"):
+        S11_db = 20 * np.log10(mag11)
+        S21_db = 20 * np.log10(mag21)
+        vswr_ = (1 + mag11) / (1 - mag11)
+    ph21 = np.unwrap(np.angle(S21), axis=-1)
+    return {
+        "S11_dB": S11_db,
+        "S21_dB": S21_db,
+        "S21_phase": np.degrees(ph21),
+        "group_delay": -np.diff(ph21, axis=-1) / (2 * np.pi * np.diff(np.asarray(freq, dtype=float))),
+        "return_loss": -S11_db,
+        "insertion_loss": -S21_db,
+        "vswr": vswr_,
+    }
@@ -0,0 +1,212 @@
+import time
+from collections import namedtuple
+
+# A schematic instance: cell as ("lib", "cell", "view") or "lib:cell:view",
+# origin (x, y), optional name (None lets ADS pick one) and angle, parameter
+# values as strings, and the parameters whose changed-callbacks must run
+Component = namedtuple(
+    "Component", ["cell", "origin", "name", "angle", "params", "callbacks"],
+    defaults=(None, 0, {}, ()),
+)
+
+# A VAR block: name -> expression strings. The default X variable is removed
+# unless it is listed.
+VarBlock = namedtuple("VarBlock", ["name", "origin", "vars", "angle"], defaults=(-90,))
+
+# A wire through points; name only labels the net in reports
+Net = namedtuple("Net", ["points", "name"], defaults=(None,))
+
+SchematicSpec = namedtuple("SchematicSpec", ["components", "vars", "nets"], defaults=((), ()))
+
+# instances maps component/VAR names to the created instances, timings the
+# seconds spent per phase
+BuildReport = namedtuple("BuildReport", ["instances", "timings"])
+
+
+def _add(design, cell, origin, name, angle):
+    if name is None:
+        return design.add_instance(cell, origin, angle=angle)
+    return design.add_instance(cell, origin, name=name, angle=angle)
+
+
+# Create everything in spec on design inside one Transaction: instances with
+# their parameters, VAR blocks, then wires, with callbacks and annotation
+# updates deferred to a single pass at the end instead of after every
+# instance. transaction defaults to db_uu.Transaction; pass
+# RecordingTransaction together with a RecordingDesign to run without ADS.
+def build_schematic(design, spec, transaction=None, save=True):
+    if transaction is None:
+        from keysight.ads.de.db_uu import Transaction as transaction
+
+    timings = {}
+    instances = {}
+    created = []
+    t0 = time.perf_counter()
+    with transaction(design) as t:
+        for c in spec.components:
+            inst = _add(design, c.cell, c.origin, c.name, c.angle)
+            for param, value in c.params.items():
+                inst.parameters[param].value = value
+            created.append((inst, c.callbacks))
+            if c.name:
+                instances[c.name] = inst
+        t1 = time.perf_counter()
+        timings["instances"] = t1 - t0
+
+        for block in spec.vars:
+            inst = _add(design, ("ads_datacmps", "VAR", "symbol"), block.origin, block.name, block.angle)
+            inst.vars.update(block.vars)
+            if "X" not in block.vars:
+                del inst.vars["X"]
+            created.append((inst, ()))
+            instances[block.name] = inst
+        t2 = time.perf_counter()
+        timings["vars"] = t2 - t1
+
+        for net in spec.nets:
+            design.add_wire(list(net.points))
+        t3 = time.perf_counter()
+        timings["wires"] = t3 - t2
+
+        for inst, callbacks in created:
+            if callbacks:
+                inst.invoke_item_parameter_changed_callback(list(callbacks))
+            inst.update_item_annotation()
+        t4 = time.perf_counter()
+        timings["annotation"] = t4 - t3
+
+        t.commit()
+    t5 = time.perf_counter()
+    timings["commit"] = t5 - t4
+
+    if save:
+        design.save_design()
+    timings["save"] = time.perf_counter() - t5
+    return BuildReport(instances, timings)
+
+
+# Chebyshev ladder of 5_lumpded_: series L1..Ln (nH) and shunt C1..Cm (pF) to
+# ground, TermG ports at both ends, values held in one VAR block. Additional
+# components (e.g. the S_Param controller) can be appended to the result.
+def lc_ladder_spec(L, C, var_name="VAR1", var_origin=(3.5, -2.75)):
+    components, nets = [], []
+    for i in range(len(L)):
+        components.append(Component("ads_rflib:L:symbol", (i * 2, 0), params={"L": f"L{i + 1} nH"}))
+        nets.append(Net([(i * 2 + 1, 0), (i * 2 + 2, 0)]))
+    for i in range(len(C)):
+        components.append(
+            Component("ads_rflib:C:symbol", (i * 2 + 1.5, -1), angle=-90, params={"C": f"C{i + 1} pF"})
+        )
+        nets.append(Net([(i * 2 + 1.5, 0), (i * 2 + 1.5, -1)]))
+        components.append(Component("ads_rflib:GROUND:symbol", (i * 2 + 1.5, -2), angle=-90))
+
+    end = len(L) * 2
+    components.append(Component("ads_simulation:TermG:symbol", (-1, -1), angle=-90))
+    nets.append(Net([(-1, -1), (-1, 0), (0, 0)], "P1"))
+    components.append(Component("ads_simulation:TermG:symbol", (end + 1, -1), angle=-90))
+    nets.append(Net([(end, 0), (end + 1, 0.0)], "P2"))
+    nets.append(Net([(end + 1, 0), (end + 1, -1.0)], "P2"))
+
+    variables = {f"L{i + 1}": f"{value}" for i, value in enumerate(L)}
+    variables.update({f"C{i + 1}": f"{value}" for i, value in enumerate(C)})
+    return SchematicSpec(components, [VarBlock(var_name, var_origin, variables)], nets)
+
+
+# Stand-ins for db_uu designs and transactions that record every call, so
+# builders can be checked and profiled without ADS
+class _RecordingParameter:
+    def __init__(self, owner, name):
+        self._owner = owner
+        self._name = name
+        self._value = None
+
+    @property
+    def value(self):
+        return self._value
+
+    @value.setter
+    def value(self, value):
+        self._value = value
+        self._owner.design.calls.append(("set_parameter", self._owner.name, self._name, value))
+
+
+class _RecordingParameters(dict):
+    def __init__(self, owner):
+        super().__init__()
+        self._owner = owner
+
+    def __missing__(self, name):
+        param = self[name] = _RecordingParameter(self._owner, name)
+        return param
+
+
+class RecordingInstance:
+    def __init__(self, design, cell, origin, name, angle):
+        self.design = design
+        self.cell = cell
+        self.origin = origin
+        self.name = name
+        self.angle = angle
+        self.parameters = _RecordingParameters(self)
+        self.is_var_instance = "VAR" in (cell if isinstance(cell, str) else cell[1])
+        self.vars = {"X": "1.0"} if self.is_var_instance else {}
+
+    def update_item_annotation(self):
+        self.design.calls.append(("update_item_annotation", self.name))
+
+    def invoke_item_parameter_changed_callback(self, params):
+        self.design.calls.append(("invoke_item_parameter_changed_callback", self.name, tuple(params)))
+
+
+class RecordingDesign:
+    def __init__(self):
+        self.calls = []
+        self.instances = []
+        self.wires = []
+        self.in_transaction = False
+
+    def add_instance(self, cell, origin, name=None, angle=0):
+        name = name or f"I{len(self.instances) + 1}"
+        inst = RecordingInstance(self, cell, tuple(origin), name, angle)
+        self.instances.append(inst)
+        self.calls.append(("add_instance", cell, tuple(origin), name, angle))
+        return inst
+
+    def add_wire(self, points):
+        self.wires.append([tuple(p) for p in points])
+        self.calls.append(("add_wire", tuple(tuple(p) for p in points)))
+
+    def save_design(self):
+        self.calls.append(("save_design",))
+
+
+class RecordingTransaction:
+    def __init__(self, design):
+        self.design = design
+
+    def __enter__(self):
+        self.design.in_transaction = True
+        self.design.calls.append(("begin_transaction",))
+        return self
+
+    def __exit__(self, *exc):
+        self.design.in_transaction = False
+
+    def commit(self):
+        self.design.calls.append(("commit",))
+
+
+# Benchmark: python schematic_builder.py [n_sections]
+if __name__ == "__main__":
+    import sys
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    spec = lc_ladder_spec([10.0] * n, [4.0] * (n - 1))
+    design = RecordingDesign()
+    report = build_schematic(design, spec, transaction=RecordingTransaction)
+    total = sum(report.timings.values())
+    n_items = len(design.instances) + len(design.wires)
+    print(f"{n}-section ladder: {len(design.instances)} instances, {len(design.wires)} wires, {len(design.calls)} DB calls")
+    for phase, seconds in report.timings.items():
+        print(f"  {phase:10s} {seconds * 1e3:8.2f} ms")
+    print(f"Python overhead {total / n_items * 1e6:.1f} us per instance/wire")
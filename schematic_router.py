@@ -0,0 +1,178 @@
+import time
+from collections import defaultdict
+
+from schematic_builder import Component, Net, SchematicSpec
+
+# Pin positions of symbols at angle 0 relative to their origin, in schematic
+# units, keyed by cell name. Pin n of an instance is PIN_OFFSETS[cell][n - 1]
+# rotated by the instance angle.
+PIN_OFFSETS = {
+    "L": ((0, 0), (1, 0)),
+    "C": ((0, 0), (1, 0)),
+    "R": ((0, 0), (1, 0)),
+    "MLIN": ((0, 0), (1, 0)),
+    "TLIN": ((0, 0), (1, 0)),
+    "Term": ((0, 0), (1, 0)),
+    "TermG": ((0, 0),),
+    "GROUND": ((0, 0),),
+}
+
+
+class RoutingError(RuntimeError):
+    pass
+
+
+def _cell_name(cell):
+    return cell[1] if isinstance(cell, tuple) else cell.split(":")[1]
+
+
+def _rotate(offset, angle):
+    x, y = offset
+    for _ in range((angle // 90) % 4):
+        x, y = -y, x
+    return x, y
+
+
+# Placement and wiring on the schematic grid. Instances are placed with
+# place(), nets are routed between named pins ("TL_L1.2") with connect().
+# Pins and wire points are kept in a spatial hash keyed by grid point, so
+# every routing check is a few dict lookups: a wire may not run along
+# another wire, pass over a pin it does not connect, or end anywhere but on a
+# pin, hence no overlapping or dangling wires. Ladder nets are short and
+# local, so routing a ladder is O(n) in the number of sections.
+class SchematicLayout:
+    def __init__(self, grid=0.125):
+        self.grid = grid
+        self.components = []
+        self.pins = {}
+        self.nets = []
+        self._pins_at = defaultdict(set)
+        self._wires_at = defaultdict(set)
+
+    def _key(self, point):
+        return round(point[0] / self.grid), round(point[1] / self.grid)
+
+    def place(self, component, ref=None):
+        ref = ref or component.name
+        if not ref or ref in self.pins:
+            raise ValueError(f"Every placed instance needs a unique ref, got {ref!r}")
+        x, y = component.origin
+        pins = []
+        for dx, dy in PIN_OFFSETS.get(_cell_name(component.cell), ()):
+            dx, dy = _rotate((dx, dy), component.angle)
+            pin = (x + dx, y + dy)
+            key = self._key(pin)
+            if self._wires_at.get(key):
+                raise RoutingError(f"Pin of {ref} at {pin} lands on a wire")
+            self._pins_at[key].add(ref)
+            pins.append(pin)
+        self.pins[ref] = pins
+        self.components.append(component)
+        return ref
+
+    def pin(self, name):
+        ref, _, n = name.rpartition(".")
+        return self.pins[ref][int(n) - 1]
+
+    # Place components left to right from origin, pitch apart, and wire pin 2
+    # of each to pin 1 of the next, e.g. the MLIN chain of a stepped-impedance
+    # filter. Component origins are ignored; returns the refs.
+    def chain(self, components, origin, pitch):
+        refs = []
+        for k, c in enumerate(components):
+            refs.append(self.place(c._replace(origin=(origin[0] + k * pitch, origin[1]))))
+        for a, b in zip(refs, refs[1:]):
+            self.connect(f"{a}.2", f"{b}.1")
+        return refs
+
+    # Route a net through the given pins in order
+    def connect(self, *pins, name=None):
+        for a, b in zip(pins, pins[1:]):
+            self.nets.append(Net(self._route(self.pin(a), self.pin(b)), name))
+
+    def _segment_keys(self, a, b):
+        (ax, ay), (bx, by) = self._key(a), self._key(b)
+        if ax == bx:
+            step = 1 if by >= ay else -1
+            return [(ax, y) for y in range(ay, by + step, step)], "v"
+        step = 1 if bx >= ax else -1
+        return [(x, ay) for x in range(ax, bx + step, step)], "h"
+
+    def _free(self, points):
+        ends = {self._key(points[0]), self._key(points[-1])}
+        for a, b in zip(points, points[1:]):
+            keys, direction = self._segment_keys(a, b)
+            for key in keys:
+                if direction in self._wires_at.get(key, ()):
+                    return False
+                if key not in ends and self._pins_at.get(key):
+                    return False
+        return True
+
+    def _route(self, a, b):
+        if a[0] == b[0] or a[1] == b[1]:
+            candidates = [[a, b]]
+        else:
+            candidates = [[a, (a[0], b[1]), b], [a, (b[0], a[1]), b]]
+        for points in candidates:
+            if self._free(points):
+                for p, q in zip(points, points[1:]):
+                    keys, direction = self._segment_keys(p, q)
+                    for key in keys:
+                        self._wires_at[key].add(direction)
+                return points
+        raise RoutingError(f"No free route from {a} to {b}")
+
+    # Wire ends that touch no pin (none for routed nets, but hand-added nets
+    # can be checked the same way)
+    def dangling(self):
+        return [
+            p for net in self.nets for p in (net.points[0], net.points[-1])
+            if not self._pins_at.get(self._key(p))
+        ]
+
+    def spec(self, vars=()):
+        return SchematicSpec(list(self.components), list(vars), list(self.nets))
+
+
+# Ports, feed lines and alternating high/low impedance MLIN sections of the
+# stepped-impedance LPF in 5_microstrip_/6_, with lengths and widths given by
+# the Line_L*/w_ind*/Line_C*/w_cap*/w50 VARs. Term1/Term2 with their grounds
+# sit 1.5 units outside the chain. VARs, controllers and MSUB are added by
+# the caller.
+def stepped_impedance_layout(n_ind, n_cap, Feed_Length, origin=(-1.5, 0), pitch=1.5):
+    layout = SchematicLayout()
+    x0, y0 = origin
+
+    sections = [Component(("ads_tlines", "MLIN", "symbol"), None, "IP_50",
+                          params={"W": "w50 mm", "L": f"{Feed_Length} mm"})]
+    for k in range(max(n_ind, n_cap)):
+        for kind, n, width in (("L", n_ind, "w_ind"), ("C", n_cap, "w_cap")):
+            if k < n:
+                sections.append(Component(
+                    ("ads_tlines", "MLIN", "symbol"), None, f"TL_{kind}{k + 1}",
+                    params={"W": f"{width}{k + 1} mm", "L": f"Line_{kind}{k + 1} mm"},
+                ))
+    sections.append(Component(("ads_tlines", "MLIN", "symbol"), None, "OP_50",
+                              params={"W": "w50 mm", "L": f"{Feed_Length} mm"}))
+    layout.chain(sections, origin, pitch)
+
+    x_end = x0 + len(sections) * pitch + 1
+    for name, x in (("Term1", x0 - pitch), ("Term2", x_end)):
+        layout.place(Component(("ads_simulation", "Term", "symbol"), (x, y0 - 1), name, -90))
+        layout.place(Component(("ads_rflib", "GROUND", "symbol"), (x, y0 - 2), "", -90), ref=f"G_{name}")
+    layout.connect("Term1.1", "IP_50.1", name="P1")
+    layout.connect("OP_50.2", "Term2.1", name="P2")
+    return layout
+
+
+# Benchmark: python schematic_router.py [n_sections ...]
+if __name__ == "__main__":
+    import sys
+
+    for n in [int(a) for a in sys.argv[1:]] or [7, 101, 1001, 10001]:
+        t0 = time.perf_counter()
+        layout = stepped_impedance_layout((n + 1) // 2, n // 2, 2)
+        elapsed = time.perf_counter() - t0
+        assert not layout.dangling()
+        print(f"N={n:6d}: {len(layout.components)} instances, {len(layout.nets)} wires in {elapsed * 1e3:.1f} ms")
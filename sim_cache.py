@@ -0,0 +1,137 @@
+import hashlib
+import os
+import shutil
+import threading
+import uuid
+from collections import namedtuple
+
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "max_bytes", "size_bytes"])
+
+
+# Identifies the installed simulator for the cache key: the versions of the
+# installed keysight Python distributions and the ADS installation directory
+# (HPEESOF_DIR), which is named after the release. Raises RuntimeError when
+# neither can be found, rather than keying results by the netlist alone.
+def simulator_version():
+    from importlib import metadata
+
+    parts = [
+        f"{dist}=={metadata.version(dist)}"
+        for dist in sorted(set(metadata.packages_distributions().get("keysight", [])))
+    ]
+    if os.environ.get("HPEESOF_DIR"):
+        parts.append(os.path.normpath(os.environ["HPEESOF_DIR"]))
+    if not parts:
+        raise RuntimeError("Cannot determine the simulator version: no keysight packages and no HPEESOF_DIR")
+    return ";".join(parts)
+
+
+# Content-addressed cache of simulation results. Entries are keyed by the
+# SHA-256 of the simulator version and the netlist text and hold a copy of the
+# output directory the simulator produced. Total size is bounded on disk and
+# the least recently used entries are evicted first. version must identify
+# the simulator (e.g. simulator_version()) so an upgrade never reuses old
+# results.
+class SimulationCache:
+    def __init__(self, cache_dir, version, max_bytes=2 * 1024**3):
+        if not version:
+            raise ValueError("SimulationCache needs a non-empty simulator version")
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, netlist):
+        return hashlib.sha256(f"{self.version}\0{netlist}".encode()).hexdigest()
+
+    # Copy a cached result into output_dir, returns False on a miss. The copy
+    # goes to a temporary directory first and its files are renamed into
+    # place, so an interrupted fetch never leaves partial results behind.
+    def fetch(self, netlist, output_dir):
+        entry = os.path.join(self.cache_dir, self.key(netlist))
+        tmp = f"{os.path.normpath(output_dir)}.tmp-{uuid.uuid4().hex}"
+        try:
+            shutil.copytree(os.path.join(entry, "data"), tmp)
+            os.utime(os.path.join(entry, "size"))
+        except FileNotFoundError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            with self._lock:
+                self.misses += 1
+            return False
+        try:
+            _move_into(tmp, output_dir)
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        with self._lock:
+            self.hits += 1
+        return True
+
+    # Store the contents of output_dir as the result of netlist
+    def store(self, netlist, output_dir):
+        entry = os.path.join(self.cache_dir, self.key(netlist))
+        tmp = f"{entry}.tmp-{uuid.uuid4().hex}"
+        shutil.copytree(output_dir, os.path.join(tmp, "data"))
+        with open(os.path.join(tmp, "size"), "w") as f:
+            f.write(str(_dir_size(os.path.join(tmp, "data"))))
+        try:
+            os.replace(tmp, entry)
+        except OSError:
+            # Another process stored the same result first
+            shutil.rmtree(tmp, ignore_errors=True)
+        self.evict()
+
+    # Drop-in for simulator.run_netlist that reuses cached results.
+    # Returns True when the result came from the cache.
+    def run_netlist(self, simulator, netlist, output_dir):
+        if self.fetch(netlist, output_dir):
+            return True
+        simulator.run_netlist(netlist, output_dir=output_dir)
+        self.store(netlist, output_dir)
+        return False
+
+    def evict(self):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            size_file = os.path.join(self.cache_dir, name, "size")
+            try:
+                with open(size_file) as f:
+                    entries.append((os.path.getmtime(size_file), int(f.read()), name))
+            except (FileNotFoundError, NotADirectoryError, ValueError):
+                continue
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(os.path.join(self.cache_dir, name), ignore_errors=True)
+            total -= size
+
+    def cache_info(self):
+        size = sum(
+            int(open(os.path.join(self.cache_dir, name, "size")).read())
+            for name in os.listdir(self.cache_dir)
+            if os.path.isfile(os.path.join(self.cache_dir, name, "size"))
+        )
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.max_bytes, size)
+
+
+# Rename every top-level item of src into dst, replacing existing ones
+def _move_into(src, dst):
+    os.makedirs(dst, exist_ok=True)
+    for name in os.listdir(src):
+        target = os.path.join(dst, name)
+        if os.path.isdir(target) and not os.path.islink(target):
+            shutil.rmtree(target)
+        os.replace(os.path.join(src, name), target)
+
+
+def _dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
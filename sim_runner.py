@@ -0,0 +1,170 @@
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+class SimulationError(RuntimeError):
+    pass
+
+
+class SimulationTimeout(SimulationError):
+    pass
+
+
+# Default simulator: the ADS circuit simulator, created inside the worker process
+def ads_simulator():
+    from keysight.edatoolbox import ads
+
+    return ads.CircuitSimulator()
+
+
+# Stand-in for ads.CircuitSimulator that needs no ADS install. run_netlist
+# writes the netlist to <name>.ds and a small S-parameter CSV so that runners
+# and result handling can be exercised on any machine. delay helps test
+# timeouts; fail_first makes the first calls for each netlist raise, counted
+# in state_dir since every attempt runs in a fresh process.
+class FakeSimulator:
+    def __init__(self, name="fake", delay=0.0, fail_first=0, state_dir=None):
+        if fail_first and state_dir is None:
+            raise ValueError("fail_first needs a state_dir to count failures in")
+        self.name = name
+        self.delay = delay
+        self.fail_first = fail_first
+        self.state_dir = state_dir
+
+    def run_netlist(self, netlist, output_dir):
+        os.makedirs(output_dir, exist_ok=True)
+        if self.fail_first:
+            os.makedirs(self.state_dir, exist_ok=True)
+            key = hashlib.sha256(netlist.encode()).hexdigest()[:16]
+            count_file = os.path.join(self.state_dir, key)
+            failures = int(open(count_file).read()) if os.path.exists(count_file) else 0
+            if failures < self.fail_first:
+                with open(count_file, "w") as f:
+                    f.write(str(failures + 1))
+                raise RuntimeError("FakeSimulator: simulated failure")
+        if self.delay:
+            time.sleep(self.delay)
+
+        with open(os.path.join(output_dir, self.name + ".ds"), "w") as f:
+            f.write(netlist)
+        freq = np.linspace(1e6, 1e9, 11)
+        s21 = 1 / (1 + 1j * freq / 5e8)
+        np.savetxt(
+            os.path.join(output_dir, self.name + ".csv"),
+            np.column_stack([freq, s21.real, s21.imag]),
+            delimiter=",",
+            header="freq,S21_re,S21_im",
+            comments="",
+        )
+
+
+# Worker process entry point for a single simulation attempt
+def _run_netlist_in_process(simulator_factory, netlist, output_dir, conn):
+    try:
+        simulator_factory().run_netlist(netlist, output_dir=output_dir)
+        conn.send(None)
+    except BaseException as err:
+        conn.send(f"{type(err).__name__}: {err}")
+    finally:
+        conn.close()
+
+
+# Runs many netlists concurrently. Each attempt runs in its own process so a
+# hung simulator can be killed on timeout, writes into a scratch directory
+# next to output_dir, and is moved into place only when it succeeds; failed
+# attempts are retried up to `retries` times. submit() returns a
+# concurrent.futures.Future resolving to output_dir, run_async() an awaitable.
+# With a SimulationCache, netlists with a cached result are not simulated.
+class SimulationRunner:
+    def __init__(self, simulator_factory=ads_simulator, max_workers=None, timeout=None, retries=0, cache=None):
+        self.simulator_factory = simulator_factory
+        self.cache = cache
+        self.timeout = timeout
+        self.retries = retries
+        self._context = multiprocessing.get_context("spawn")
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or os.cpu_count())
+        self._active_dirs = set()
+        self._lock = threading.Lock()
+
+    def submit(self, netlist, output_dir):
+        output_dir = os.path.abspath(output_dir)
+        with self._lock:
+            if output_dir in self._active_dirs:
+                raise ValueError(f"Output directory already used by a pending job: {output_dir}")
+            self._active_dirs.add(output_dir)
+        future = self._executor.submit(self._run_job, netlist, output_dir)
+        future.add_done_callback(lambda _: self._release(output_dir))
+        return future
+
+    def map(self, jobs):
+        return [self.submit(netlist, output_dir) for netlist, output_dir in jobs]
+
+    def run_async(self, netlist, output_dir):
+        return asyncio.wrap_future(self.submit(netlist, output_dir))
+
+    async def gather(self, jobs):
+        return await asyncio.gather(*(self.run_async(n, d) for n, d in jobs))
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+    def _release(self, output_dir):
+        with self._lock:
+            self._active_dirs.discard(output_dir)
+
+    def _run_job(self, netlist, output_dir):
+        if self.cache is not None and self.cache.fetch(netlist, output_dir):
+            return output_dir
+        error = None
+        for attempt in range(self.retries + 1):
+            scratch = f"{output_dir}.attempt{attempt}"
+            shutil.rmtree(scratch, ignore_errors=True)
+            try:
+                self._run_attempt(netlist, scratch)
+            except SimulationError as err:
+                shutil.rmtree(scratch, ignore_errors=True)
+                error = err
+                continue
+            shutil.rmtree(output_dir, ignore_errors=True)
+            os.replace(scratch, output_dir)
+            if self.cache is not None:
+                self.cache.store(netlist, output_dir)
+            return output_dir
+        raise error
+
+    def _run_attempt(self, netlist, scratch):
+        parent_conn, child_conn = self._context.Pipe(duplex=False)
+        process = self._context.Process(
+            target=_run_netlist_in_process,
+            args=(self.simulator_factory, netlist, scratch, child_conn),
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        try:
+            if not parent_conn.poll(self.timeout):
+                process.kill()
+                raise SimulationTimeout(f"Simulation exceeded {self.timeout} s: {scratch}")
+            try:
+                message = parent_conn.recv()
+            except EOFError:
+                message = f"Simulator process exited with code {process.exitcode}"
+        finally:
+            process.join()
+            parent_conn.close()
+        if message is not None:
+            raise SimulationError(message)
@@ -0,0 +1,67 @@
+from collections import namedtuple
+
+import numpy as np
+
+# Low pass filter spec mask, all levels in dB as positive numbers:
+#   ripple_db   max insertion loss from DC up to fc
+#   La          min rejection from fs upwards
+#   S11_max_db  max S11 (e.g. -15) up to fc, optional
+# Any field may be an array broadcastable to the sweep shape to give every
+# sweep point its own limits; unused checks can be left as None.
+SpecMask = namedtuple("SpecMask", ["fc", "ripple_db", "fs", "La", "S11_max_db"], defaults=(None, None, None))
+
+# Per sweep point: overall pass/fail, worst margin (dB, negative = violation)
+# and the margin of each check (NaN when the check is not used)
+MaskResult = namedtuple("MaskResult", ["passed", "margin", "ripple_margin", "rejection_margin", "S11_margin"])
+
+
+def _field(value):
+    return None if value is None else np.asarray(value, dtype=float)[..., None]
+
+
+# Margin of every frequency point (dB, negative = violation) for each check as
+# (ripple, rejection, S11), arrays of shape (sweep..., freq) that are +inf
+# outside the band the check applies to, or None when the check is not used.
+# This is the smooth per-point form an optimizer needs; evaluate_mask reduces
+# it to the worst case.
+def point_margins(mask, freq, S21, S11=None):
+    freq = np.asarray(freq, dtype=float)
+    with np.errstate(divide="ignore"):
+        loss21 = -20 * np.log10(np.abs(S21))
+        S11_db = None if S11 is None else 20 * np.log10(np.abs(S11))
+
+    passband = freq <= _field(mask.fc)
+
+    ripple = None
+    if mask.ripple_db is not None:
+        ripple = np.where(passband, _field(mask.ripple_db) - loss21, np.inf)
+
+    rejection = None
+    if mask.La is not None:
+        stopband = freq >= _field(mask.fs)
+        rejection = np.where(stopband, loss21 - _field(mask.La), np.inf)
+
+    S11_margin = None
+    if mask.S11_max_db is not None:
+        if S11_db is None:
+            raise ValueError("SpecMask has an S11 limit but no S11 data was given")
+        S11_margin = np.where(passband, _field(mask.S11_max_db) - S11_db, np.inf)
+
+    return ripple, rejection, S11_margin
+
+
+# Evaluate a SpecMask over S-parameters of shape (sweep..., freq) in one
+# vectorized pass; freq is the shared 1-D frequency axis in Hz. A sweep point
+# passes when its worst margin is at least -tol (dB), e.g. to allow for
+# component values rounded for display.
+def evaluate_mask(mask, freq, S21, S11=None, tol=0.0):
+    checks = point_margins(mask, freq, S21, S11)
+    # [()] gives a scalar like np.min for a single trace
+    nan = np.full(np.shape(S21)[:-1], np.nan)[()]
+    ripple_margin, rejection_margin, S11_margin = (
+        nan if m is None else np.min(m, axis=-1) for m in checks
+    )
+
+    margins = np.stack(np.broadcast_arrays(ripple_margin, rejection_margin, S11_margin))
+    margin = np.fmin.reduce(margins, axis=0)
+    return MaskResult(margin >= -tol, margin, ripple_margin, rejection_margin, S11_margin)
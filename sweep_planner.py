@@ -0,0 +1,180 @@
+import math
+import os
+import re
+from collections import namedtuple
+from concurrent.futures import as_completed
+
+import numpy as np
+
+from dataset_utils import SweepArrays
+
+# One netlist variant of a sweep: index selects the part of the result array
+# it fills, values holds the VAR values fixed for this variant and inner is
+# (name, values) for the points run by a ParamSweep inside it, or None
+SweepJob = namedtuple("SweepJob", ["index", "values", "inner"])
+
+# axes are the labeled result axes (grid variables, or "point" for scattered
+# points whose coordinates are in points), jobs the netlist variants
+SweepPlan = namedtuple("SweepPlan", ["axes", "jobs", "inner", "points"])
+
+
+def _is_linear(values):
+    values = np.asarray(values, dtype=float)
+    if len(values) < 2:
+        return True
+    step = np.diff(values)
+    return bool(np.all(step > 0) and np.allclose(step, step[0], rtol=1e-6, atol=0))
+
+
+# Latin hypercube sample of n points over bounds (name -> (low, high)): every
+# variable's range is cut into n strata and each stratum is used exactly once.
+# Returns name -> array of n values.
+def latin_hypercube(bounds, n, seed=None):
+    rng = np.random.default_rng(seed)
+    points = {}
+    for name, (low, high) in bounds.items():
+        u = (rng.permutation(n) + rng.random(n)) / n
+        points[name] = low + (high - low) * u
+    return points
+
+
+# Plan a full grid sweep over axes (VAR name -> 1-D values) for n_jobs
+# concurrent simulations. Every netlist variant has a fixed cost (simulator
+# start-up, dataset write), so the plan uses as few variants as keep n_jobs
+# workers busy: with nested=True the largest linearly spaced axis runs as a
+# ParamSweep inside each variant, the other axes are enumerated as variants,
+# and the nested axis is split into sub-ranges only when there are fewer
+# variants than workers.
+def plan_grid(axes, n_jobs=None, nested=True):
+    n_jobs = n_jobs or os.cpu_count()
+    axes = {name: np.asarray(values, dtype=float) for name, values in axes.items()}
+    names = list(axes)
+
+    inner = None
+    if nested:
+        linear = [name for name in names if len(axes[name]) > 1 and _is_linear(axes[name])]
+        if linear:
+            inner = max(linear, key=lambda name: len(axes[name]))
+    outer = [name for name in names if name != inner]
+    n_outer = math.prod(len(axes[name]) for name in outer)
+
+    chunks = [None]
+    if inner is not None:
+        n_chunks = min(max(1, -(-n_jobs // n_outer)), len(axes[inner]))
+        chunks = np.array_split(np.arange(len(axes[inner])), n_chunks)
+
+    jobs = []
+    for outer_index in np.ndindex(*(len(axes[name]) for name in outer)):
+        values = {name: axes[name][i] for name, i in zip(outer, outer_index)}
+        for chunk in chunks:
+            position = dict(zip(outer, outer_index))
+            if chunk is not None:
+                position[inner] = slice(chunk[0], chunk[-1] + 1)
+            index = tuple(position[name] for name in names)
+            job_inner = None if chunk is None else (inner, axes[inner][chunk])
+            jobs.append(SweepJob(index, values, job_inner))
+    return SweepPlan(axes, jobs, inner, None)
+
+
+# Plan a sweep over scattered points (name -> array of n values, e.g. from
+# latin_hypercube), one netlist variant per point
+def plan_points(points):
+    points = {name: np.asarray(values, dtype=float) for name, values in points.items()}
+    n = len(next(iter(points.values())))
+    jobs = [
+        SweepJob((i,), {name: values[i] for name, values in points.items()}, None)
+        for i in range(n)
+    ]
+    return SweepPlan({"point": np.arange(n)}, jobs, None, points)
+
+
+def _format(value):
+    return f"{float(value):.12g}"
+
+
+# Set VAR values in netlist text. A VAR instance is netlisted as one
+# unindented `name=expression` assignment per line; indented or continued
+# lines belong to component statements and are never touched. Each variable
+# must be assigned exactly once. Only the expression is replaced: the unit of
+# a `number unit` value such as `H=0.5 mm` and anything after it on the line
+# are kept.
+def set_netlist_vars(netlist, values):
+    for name, value in values.items():
+        pattern = re.compile(
+            rf"(?<!\\\n)^{re.escape(name)}=[^\s\\]+([ \t]+[A-Za-z]+(?![\w\[\]]*=))?", re.MULTILINE
+        )
+        matches = pattern.findall(netlist)
+        if len(matches) != 1:
+            raise KeyError(f"Variable {name!r} is assigned {len(matches)} times in the netlist, expected once")
+        netlist = pattern.sub(lambda m: f"{name}={_format(value)}{m.group(1) or ''}", netlist)
+    return netlist
+
+
+# Point the ParamSweep instance sweep_name of a netlist at variable var with
+# the linearly spaced values (Start/Stop/Step). Continued lines are handled.
+def set_netlist_sweep(netlist, sweep_name, var, values):
+    values = np.asarray(values, dtype=float)
+    if not _is_linear(values):
+        raise ValueError(f"ParamSweep values for {var!r} must be linearly spaced")
+    step = values[1] - values[0] if len(values) > 1 else 1.0
+    settings = {
+        "SweepVar": f'"{var}"', "Start": _format(values[0]),
+        "Stop": _format(values[-1]), "Step": _format(step),
+    }
+
+    statement = re.compile(rf"^ParamSweep:{re.escape(sweep_name)}\b(?:[^\n]*\\\n)*[^\n]*", re.MULTILINE)
+    match = statement.search(netlist)
+    if match is None:
+        raise KeyError(f"ParamSweep {sweep_name!r} not found in the netlist")
+    text = match.group(0)
+    for key, value in settings.items():
+        # value with an optional unit, stopping before the next name=value pair
+        token = re.compile(rf"(?<=\s){key}=[^\s\\]+(?:[ \t]+[A-Za-z]+(?![\w\[\]]*=))?")
+        text, count = token.subn(f"{key}={value}", text)
+        if not count:
+            text += f" {key}={value}"
+    return netlist[:match.start()] + text + netlist[match.end():]
+
+
+# Run a SweepPlan. netlist is the text of the design (e.g. from
+# design.generate_netlist()); every job gets its VAR values and, for nested
+# plans, the range of the ParamSweep sweep_name patched in. The variants are
+# dispatched concurrently on runner (a SimulationRunner) into out_dir/job<i>,
+# and load(output_dir) reads each result as SweepArrays whose axes are the
+# nested variable (if any) followed by the same trailing axes (e.g. freq) for
+# every job. The parts are reassembled into one SweepArrays over the plan
+# axes plus the trailing axes; scattered-point plans also carry the point
+# coordinates as values.
+def run_sweep(plan, netlist, load, runner, out_dir, sweep_name=None):
+    if plan.inner is not None and sweep_name is None:
+        raise ValueError("A nested plan needs the name of the ParamSweep instance to drive")
+
+    jobs = []
+    for i, job in enumerate(plan.jobs):
+        text = set_netlist_vars(netlist, job.values)
+        if job.inner is not None:
+            text = set_netlist_sweep(text, sweep_name, *job.inner)
+        jobs.append((text, os.path.join(out_dir, f"job{i}")))
+    futures = {future: job for future, job in zip(runner.map(jobs), plan.jobs)}
+
+    shape = tuple(len(values) for values in plan.axes.values())
+    axes, values = dict(plan.axes), {}
+    for future in as_completed(futures):
+        job = futures[future]
+        part = load(future.result())
+        trailing = list(part.axes.items())
+        if job.inner is not None:
+            name, inner_values = trailing.pop(0)
+            if name != job.inner[0] or not np.allclose(inner_values, job.inner[1]):
+                raise ValueError(f"Result of {future.result()} is not swept over {job.inner[0]!r} as planned")
+        if not values:
+            axes.update(trailing)
+        trailing_shape = tuple(len(a) for _, a in trailing)
+        for name, data in part.values.items():
+            if name not in values:
+                values[name] = np.full(shape + trailing_shape, np.nan, dtype=data.dtype)
+            values[name][job.index] = data
+
+    if plan.points is not None:
+        values.update(plan.points)
+    return SweepArrays(axes, values)
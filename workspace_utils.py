@@ -0,0 +1,116 @@
+import hashlib
+import inspect
+import json
+import os
+import shutil
+
+import keysight.ads.de as de
+
+MANIFEST_NAME = "python_manifest.json"
+
+
+def _params_hash(params):
+    text = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+# Hash of the source files a cell is generated with (paths, modules or
+# functions, e.g. the script's __file__ and the builder functions it calls).
+# Put it in the cell params so that editing the generator code rebuilds the
+# cell like a changed design value does.
+def source_hash(*sources):
+    h = hashlib.sha256()
+    for src in sources:
+        path = src if isinstance(src, (str, os.PathLike)) else inspect.getsourcefile(src)
+        with open(path, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def _read_manifest(wrk_path):
+    try:
+        with open(os.path.join(wrk_path, MANIFEST_NAME)) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _write_manifest(wrk_path, manifest):
+    tmp = os.path.join(wrk_path, MANIFEST_NAME + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, os.path.join(wrk_path, MANIFEST_NAME))
+
+
+# Open the workspace at wrk_path with library lib, creating it only when needed.
+# The setup (library, layout technology, PDK libraries) is recorded in a
+# manifest inside the workspace; if it matches, the existing workspace is
+# reopened instead of being deleted and rebuilt. cells maps each cell name to
+# the parameters it is generated from; cells whose parameters changed since
+# they were recorded with record_cell() are deleted and returned as stale so
+# the caller regenerates only those.
+#
+# layout_tech is ("std_ads", units, resolution, flag) for
+# create_layout_tech_std_ads or ("pdk", pdk_name) for create_layout_tech_from_pdk.
+# pdk_libs is a list of (name, path) libraries added read-only.
+def ensure_workspace(wrk_path, lib, cells=None, layout_tech=None, pdk_libs=()):
+    cells = cells or {}
+    lib_path = os.path.join(wrk_path, lib)
+    setup = json.loads(json.dumps(
+        {"lib": lib, "layout_tech": layout_tech, "pdk_libs": [list(p) for p in pdk_libs]}
+    ))
+
+    # ensure to start from a closed workspace
+    if de.workspace_is_open():
+        de.close_workspace()
+
+    manifest = _read_manifest(wrk_path) if os.path.exists(wrk_path) else None
+    if manifest is not None and manifest.get("setup") == setup:
+        recorded = manifest.get("cells", {})
+        stale = {cell for cell, params in cells.items() if recorded.get(cell) != _params_hash(params)}
+        # Remove stale cells before the library is opened
+        for cell in stale:
+            shutil.rmtree(os.path.join(lib_path, cell), ignore_errors=True)
+            recorded.pop(cell, None)
+        _write_manifest(wrk_path, manifest)
+
+        wrk_space = de.open_workspace(wrk_path)
+        library = wrk_space.open_library(lib, lib_path, de.LibraryMode.SHARED)
+        return library, stale
+
+    # delete the workspace if it exists
+    if os.path.exists(wrk_path):
+        shutil.rmtree(wrk_path)
+
+    # create the workspace
+    de.create_workspace(wrk_path)
+    wrk_space = de.open_workspace(wrk_path)
+    library = de.create_new_library(lib, lib_path)
+    wrk_space.add_library(lib, lib_path, mode=de.LibraryMode.SHARED)
+
+    pdk_paths = dict(pdk_libs)
+    for name, path in pdk_libs:
+        wrk_space.add_library(name, path, mode=de.LibraryMode.READ_ONLY)
+
+    # Create schematic and layout technology
+    library.setup_schematic_tech()
+    if layout_tech is not None and layout_tech[0] == "std_ads":
+        library.create_layout_tech_std_ads(*layout_tech[1:])
+    elif layout_tech is not None and layout_tech[0] == "pdk":
+        pdk_name = layout_tech[1]
+        open_pdk_lib = wrk_space.open_library(
+            pdk_name, pdk_paths[pdk_name], mode=de.LibraryMode.READ_ONLY
+        )
+        library.create_layout_tech_from_pdk(open_pdk_lib, copy_tech=False)
+
+    _write_manifest(wrk_path, {"setup": setup, "cells": {}})
+    return library, set(cells)
+
+
+# Record that cell was (re)generated from params, call after saving the design
+def record_cell(wrk_path, cell, params):
+    manifest = _read_manifest(wrk_path)
+    if manifest is None:
+        raise RuntimeError(f"No workspace manifest found in {wrk_path}")
+    manifest.setdefault("cells", {})[cell] = _params_hash(params)
+    _write_manifest(wrk_path, manifest)
@@ -0,0 +1,112 @@
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from abcd_cascade import stepped_impedance_sparams
+from spec_mask import evaluate_mask
+
+# One-sigma manufacturing tolerances. Er, H_mm and tanD are relative (0.02 is
+# 2 %), width_mm is an absolute etch bias applied to every line of a sample and
+# length_mm an absolute error drawn independently for each section.
+Tolerances = namedtuple(
+    "Tolerances", ["Er", "H_mm", "tanD", "width_mm", "length_mm"],
+    defaults=(0.02, 0.03, 0.1, 0.01, 0.01),
+)
+
+# yield_ is the passing fraction, margin the spec margin (dB) of every sample,
+# and sensitivity maps each perturbed parameter to the change in margin (dB)
+# per one-sigma deviation from a linear fit over all samples
+YieldResult = namedtuple("YieldResult", ["yield_", "passed", "margin", "sensitivity"])
+
+
+# design holds the synthesized stepped-impedance filter as computed in
+# 5_microstrip_lpf_synthesis.py: Line_L, Line_C, w_ind, w_cap, w50 (mm) and the
+# substrate Er, H_mm, T_mm, tanD plus Feed_Length
+def _parameter_names(design):
+    names = ["Er", "H_mm", "tanD", "width"]
+    names += [f"Line_L{i + 1}" for i in range(len(design["Line_L"]))]
+    names += [f"Line_C{i + 1}" for i in range(len(design["Line_C"]))]
+    return names
+
+
+# Evaluate one chunk of samples; runs in a worker process
+def _evaluate_chunk(design, mask, freq, tolerances, n, seed_seq):
+    rng = np.random.default_rng(seed_seq)
+    nL = len(design["Line_L"])
+    nC = len(design["Line_C"])
+    z = rng.standard_normal((n, 4 + nL + nC))
+
+    Er = design["Er"] * (1 + tolerances.Er * z[:, 0])
+    H_mm = design["H_mm"] * (1 + tolerances.H_mm * z[:, 1])
+    tanD = design["tanD"] * np.maximum(1 + tolerances.tanD * z[:, 2], 0)
+    bias = tolerances.width_mm * z[:, 3]
+    Line_L = np.asarray(design["Line_L"]) + tolerances.length_mm * z[:, 4:4 + nL]
+    Line_C = np.asarray(design["Line_C"]) + tolerances.length_mm * z[:, 4 + nL:]
+
+    S11, S21 = stepped_impedance_sparams(
+        Line_L, Line_C,
+        design["w_ind"] + bias, design["w_cap"] + bias, design["w50"] + bias,
+        Er, H_mm, freq,
+        T_mm=design.get("T_mm", 0.0), tanD=tanD, Feed_Length=design.get("Feed_Length", 2),
+    )
+    result = evaluate_mask(mask, freq, S21, S11)
+    return z, result.margin
+
+
+# Monte-Carlo yield of a synthesized stepped-impedance LPF against a SpecMask.
+# Samples are drawn in chunks, each with its own child of SeedSequence(seed),
+# so results are reproducible and independent of n_workers. Chunks are
+# evaluated in batched ABCD passes across a process pool. On Windows call this
+# from under `if __name__ == "__main__":` since workers re-import the script.
+def monte_carlo_yield(
+    design, mask, freq, tolerances=Tolerances(), n_samples=100000, seed=0,
+    n_workers=None, chunk_size=1000,
+):
+    freq = np.asarray(freq, dtype=float)
+    n_chunks = -(-n_samples // chunk_size)
+    sizes = [min(chunk_size, n_samples - i * chunk_size) for i in range(n_chunks)]
+    seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    args = [(design, mask, freq, tolerances, n, s) for n, s in zip(sizes, seeds)]
+
+    n_workers = n_workers or os.cpu_count()
+    if n_workers > 1 and n_chunks > 1:
+        with ProcessPoolExecutor(max_workers=min(n_workers, n_chunks)) as pool:
+            chunks = list(pool.map(_evaluate_chunk, *zip(*args)))
+    else:
+        chunks = [_evaluate_chunk(*a) for a in args]
+
+    z = np.concatenate([c[0] for c in chunks])
+    margin = np.concatenate([c[1] for c in chunks])
+    passed = margin >= 0
+
+    # Linear sensitivity of the margin to each standardized perturbation
+    X = np.column_stack([np.ones(len(z)), z])
+    finite = np.isfinite(margin)
+    coef = np.linalg.lstsq(X[finite], margin[finite], rcond=None)[0][1:]
+    sensitivity = dict(zip(_parameter_names(design), coef))
+
+    return YieldResult(passed.mean(), passed, margin, sensitivity)
+
+
+# Benchmark on the 5_microstrip_lpf_synthesis.py design:
+# python yield_analysis.py [n_samples]
+if __name__ == "__main__":
+    import sys
+
+    from filter_optimizer import stepped_impedance_design
+    from spec_mask import SpecMask
+
+    fs = 3500e6
+    design = stepped_impedance_design(0.1, 2000e6, fs, 50, 7, 3.66, 0.508, 0.017, 0.0023, 130, 15)
+    mask = SpecMask(fc=1.9e9, ripple_db=0.3, fs=fs, La=30, S11_max_db=-15)
+    freq = np.linspace(0.1e9, 5e9, 200)
+
+    n = int(float(sys.argv[1])) if len(sys.argv) > 1 else 100000
+    t0 = time.perf_counter()
+    result = monte_carlo_yield(design, mask, freq, n_samples=n)
+    print(f"{n} samples in {time.perf_counter() - t0:.2f} s, yield = {100 * result.yield_:.1f} %")
+    for name, s in sorted(result.sensitivity.items(), key=lambda kv: -abs(kv[1])):
+        print(f"  {name:10s} {s:+.3f} dB/sigma")